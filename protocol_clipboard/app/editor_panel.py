@@ -1,14 +1,72 @@
 """
 Editor panel - text editor with autosave and clipboard integration.
 """
+import time
+from collections import deque
+
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QTextEdit, QLabel
-from PyQt5.QtCore import QTimer
+from PyQt5.QtGui import QTextCursor
+from PyQt5.QtCore import QCoreApplication, QTimer, QObject, QRunnable, QThreadPool, QMutex, pyqtSignal
 
-from .styles import get_text_edit_stylesheet, get_label_stylesheet
-from .signals import signals
+from .styles import get_label_stylesheet
+from .signals import signals, fast_bus
 from ..utils.storage import storage
 from ..utils import clipboard
 
+# Autosave debounce intervals (ms): default, right after a large paste,
+# and while the user is typing fast enough to keep re-arming the timer
+AUTOSAVE_DELAY_MS = 400
+AUTOSAVE_PASTE_DELAY_MS = 50
+AUTOSAVE_BURST_DELAY_MS = 1000
+PASTE_THRESHOLD_CHARS = 4096
+BURST_NUDGES_PER_SECOND = 5
+
+# Documents larger than this are inserted in chunks so the first screenful
+# shows up before the whole text has been laid out
+PROGRESSIVE_LOAD_CHARS = 256 * 1024
+LOAD_CHUNK_CHARS = 64 * 1024
+
+class _SaveNotifier(QObject):
+    """Carries save completions and failures from the writer thread back to the GUI thread."""
+    
+    saved = pyqtSignal(str, str, str)
+    failed = pyqtSignal(str, str, str, str)
+
+
+class _SaveTask(QRunnable):
+    """Writes the latest pending content for one protocol version in the background."""
+    
+    def __init__(self, key: tuple, pending: dict, mutex: QMutex, notifier: _SaveNotifier):
+        super().__init__()
+        self.key = key
+        self.pending = pending
+        self.mutex = mutex
+        self.notifier = notifier
+    
+    def run(self):
+        """Pop whatever is queued for this key and write it."""
+        self.mutex.lock()
+        try:
+            entry = self.pending.pop(self.key, None)
+        finally:
+            self.mutex.unlock()
+        
+        if entry is None:
+            return  # Moved to another key when the protocol was renamed
+        kind, payload = entry
+        
+        model_name, protocol_name, version = self.key
+        try:
+            if kind == 'delta':
+                storage.append_delta(model_name, protocol_name, version, payload)
+            else:
+                storage.write_version(model_name, protocol_name, version, payload)
+        except OSError as e:
+            self.notifier.failed.emit(model_name, protocol_name, version, str(e))
+            return
+        
+        self.notifier.saved.emit(model_name, protocol_name, version)
+
 
 class EditorPanel(QWidget):
     """Panel for editing protocol content with autosave."""
@@ -22,6 +80,24 @@ class EditorPanel(QWidget):
         self.autosave_timer.setSingleShot(True)
         self.autosave_timer.timeout.connect(self._save_content)
         self._is_loading = False
+        self._dirty = False
+        self._last_saved_text = None
+        self._last_saved_rev = -1
+        self._pending_deltas = []
+        self._delta_chars = 0
+        self._last_change_size = 0
+        self._recent_nudges = deque()
+        self._load_generation = 0
+        
+        # Writes run on a single background thread, so they stay in order;
+        # saves queued for the same version are coalesced until it picks them up
+        self._save_pool = QThreadPool(self)
+        self._save_pool.setMaxThreadCount(1)
+        self._save_mutex = QMutex()
+        self._pending_saves = {}
+        self._save_notifier = _SaveNotifier(self)
+        self._save_notifier.saved.connect(self._on_saved)
+        self._save_notifier.failed.connect(self._on_save_failed)
         self._setup_ui()
         self._connect_signals()
     
@@ -38,18 +114,31 @@ class EditorPanel(QWidget):
         
         # Text edit
         self.text_edit = QTextEdit()
-        self.text_edit.setStyleSheet(get_text_edit_stylesheet())
         self.text_edit.setPlaceholderText("Select a protocol to edit...")
         self.text_edit.textChanged.connect(self._on_text_changed)
         self.text_edit.setEnabled(False)
+        self.text_edit.document().contentsChange.connect(self._on_contents_change)
         layout.addWidget(self.text_edit)
     
     def _connect_signals(self):
         """Connect to application signals."""
-        signals.protocol_selected.connect(self._on_protocol_selected)
+        fast_bus.protocol_selected.connect(self._on_protocol_selected)
+        fast_bus.protocol_renamed.connect(self._on_protocol_renamed)
+        fast_bus.flush_requested.connect(self.save_and_cleanup)
     
     def _on_protocol_selected(self, model_name: str, protocol_name: str, version: str):
         """Handle protocol selection - load version content and copy to clipboard."""
+        # Same version re-selected: the buffer already holds it, just copy again
+        if (self.current_model, self.current_protocol, self.current_version) == (model_name, protocol_name, version):
+            if self._is_loading:
+                return  # Still being streamed in
+            if self._dirty:
+                self.autosave_timer.stop()
+                self._save_content()
+            clipboard.copy(self.text_edit.toPlainText())
+            signals.protocol_loaded.emit(model_name, protocol_name, version)
+            return
+        
         # Save current content first if different protocol or version
         if self.current_model and self.current_protocol and self.current_version:
             if (self.current_model != model_name or 
@@ -62,11 +151,18 @@ class EditorPanel(QWidget):
         self.current_protocol = protocol_name
         self.current_version = version
         
-        # Load content from specific version
+        # Load content from specific version once queued writes have landed
+        self._save_pool.waitForDone()
         self._is_loading = True
+        self._dirty = False
         content = storage.read_version(model_name, protocol_name, version)
-        self.text_edit.setPlainText(content)
+        self._last_saved_text = content
+        self._pending_deltas = []
+        self._delta_chars = 0
+        if not self._set_text(content):
+            return  # Another selection took over while this one was loading
         self._is_loading = False
+        self._last_saved_rev = self.text_edit.document().revision()
         
         # Enable editing
         self.text_edit.setEnabled(True)
@@ -77,6 +173,60 @@ class EditorPanel(QWidget):
         # Emit loaded signal for status bar
         signals.protocol_loaded.emit(model_name, protocol_name, version)
     
+    def _on_protocol_renamed(self, model_name: str, old_name: str, new_name: str):
+        """
+        Follow a rename without reloading: the text is the same, only the name changed.
+        Writes still queued under the old name are moved to the new one.
+        """
+        moved = []
+        self._save_mutex.lock()
+        try:
+            for key in [k for k in self._pending_saves if k[:2] == (model_name, old_name)]:
+                new_key = (model_name, new_name, key[2])
+                self._pending_saves[new_key] = self._pending_saves.pop(key)
+                moved.append(new_key)
+        finally:
+            self._save_mutex.unlock()
+        
+        for key in moved:
+            self._save_pool.start(_SaveTask(key, self._pending_saves, self._save_mutex, self._save_notifier))
+        
+        if (self.current_model, self.current_protocol) == (model_name, old_name):
+            self.current_protocol = new_name
+    
+    def _set_text(self, content: str) -> bool:
+        """
+        Put content into the editor. Large documents are inserted in chunks,
+        letting the event loop paint in between; the editor is read-only and
+        undo is off meanwhile. Returns False if a newer load started during
+        one of those event loop turns.
+        """
+        self._load_generation += 1
+        if len(content) <= PROGRESSIVE_LOAD_CHARS:
+            self.text_edit.setPlainText(content)
+            return True
+        
+        generation = self._load_generation
+        document = self.text_edit.document()
+        document.setUndoRedoEnabled(False)
+        self.text_edit.setReadOnly(True)
+        try:
+            self.text_edit.clear()
+            cursor = QTextCursor(document)
+            for start in range(0, len(content), LOAD_CHUNK_CHARS):
+                cursor.insertText(content[start:start + LOAD_CHUNK_CHARS])
+                QCoreApplication.processEvents()
+                if generation != self._load_generation:
+                    return False
+        finally:
+            # A load or clear that took over ran to completion inside
+            # processEvents, so nothing else still needs the editor locked
+            document.setUndoRedoEnabled(True)
+            self.text_edit.setReadOnly(False)
+        
+        self.text_edit.moveCursor(QTextCursor.Start)
+        return True
+    
     def _on_text_changed(self):
         """Handle text changes - trigger autosave with debounce."""
         if self._is_loading:
@@ -85,27 +235,158 @@ class EditorPanel(QWidget):
         if not self.current_model or not self.current_protocol or not self.current_version:
             return
         
-        # Restart the autosave timer (debounce ~400ms)
+        self._dirty = True
+        
+        # Restart the autosave timer with a delay fitted to the edit pattern
         self.autosave_timer.stop()
-        self.autosave_timer.start(400)
+        self.autosave_timer.start(self._autosave_delay())
+    
+    def _autosave_delay(self) -> int:
+        """
+        Pick the debounce interval: flush large pastes quickly, back off while
+        the timer keeps being re-armed by fast typing, default otherwise.
+        """
+        now = time.monotonic()
+        self._recent_nudges.append(now)
+        while self._recent_nudges[0] < now - 1.0:
+            self._recent_nudges.popleft()
+        
+        if self._last_change_size > PASTE_THRESHOLD_CHARS:
+            return AUTOSAVE_PASTE_DELAY_MS
+        if len(self._recent_nudges) > BURST_NUDGES_PER_SECOND:
+            return AUTOSAVE_BURST_DELAY_MS
+        return AUTOSAVE_DELAY_MS
     
     def _save_content(self):
         """Save the current content to storage."""
         if not self.current_model or not self.current_protocol or not self.current_version:
             return
         
+        # Nothing typed since the last save
+        if not self._dirty:
+            return
+        
+        # Document untouched since the last save: skip copying the text out
+        revision = self.text_edit.document().revision()
+        if revision == self._last_saved_rev:
+            self._dirty = False
+            return
+        
         content = self.text_edit.toPlainText()
-        storage.write_version(self.current_model, self.current_protocol, self.current_version, content)
+        if content == self._last_saved_text:
+            # Text changed back to what is already on disk
+            self._last_saved_rev = revision
+            self._dirty = False
+            return
+        
+        key = (self.current_model, self.current_protocol, self.current_version)
+        if self._deltas_reproduce(content):
+            # Small edit: append only what changed
+            self._queue_save(key, 'delta', self._pending_deltas, content)
+            self._delta_chars += sum(len(added) for _, _, added in self._pending_deltas)
+        else:
+            self._queue_save(key, 'full', content, content)
+            self._delta_chars = 0
+        self._pending_deltas = []
+        self._last_saved_text = content
+        self._last_saved_rev = revision
+        self._dirty = False
+    
+    def _queue_save(self, key: tuple, kind: str, payload, content: str):
+        """
+        Hand a write to the background thread.
+        If a write for the same version is still queued, merge into it instead:
+        deltas are appended to queued deltas, anything else becomes a full write.
+        """
+        self._save_mutex.lock()
+        try:
+            queued = self._pending_saves.get(key)
+            if queued is not None and kind == 'delta':
+                if queued[0] == 'delta':
+                    payload = queued[1] + payload
+                else:
+                    kind, payload = 'full', content
+            self._pending_saves[key] = (kind, payload)
+        finally:
+            self._save_mutex.unlock()
+        
+        if queued is None:
+            self._save_pool.start(_SaveTask(key, self._pending_saves, self._save_mutex, self._save_notifier))
+    
+    def _on_saved(self, model_name: str, protocol_name: str, version: str):
+        """
+        Emit saved signal once a background write has finished.
+        Writes are only queued when the content changed, so unchanged
+        autosaves never reach here.
+        """
+        signals.protocol_saved.emit(model_name, protocol_name, version)
+    
+    def _on_save_failed(self, model_name: str, protocol_name: str, version: str, error: str):
+        """
+        Report a background write that failed. If that version is still open,
+        mark it dirty with nothing known to be on disk, so the next save
+        rewrites the whole text.
+        """
+        if (self.current_model, self.current_protocol, self.current_version) == (model_name, protocol_name, version):
+            self._dirty = True
+            self._last_saved_text = None
+            self._last_saved_rev = -1
+            self._pending_deltas = []
+            self._delta_chars = 0
+        signals.protocol_save_failed.emit(model_name, protocol_name, version, error)
+    
+    def save_and_cleanup(self):
+        """Flush any pending edit and wait for queued writes to finish."""
+        if self.autosave_timer.isActive():
+            self.autosave_timer.stop()
+        if self._dirty:
+            self._save_content()
+        self._save_pool.waitForDone()
+    
+    def _on_contents_change(self, position: int, removed: int, added: int):
+        """Record an edit as (position, chars_removed, added_text) for delta saves."""
+        if self._is_loading:
+            return
+        
+        self._last_change_size = added
+        
+        document = self.text_edit.document()
+        cursor = QTextCursor(document)
+        cursor.setPosition(min(position, document.characterCount() - 1))
+        cursor.setPosition(min(position + added, document.characterCount() - 1), QTextCursor.KeepAnchor)
+        text = cursor.selectedText().replace('\u2029', '\n').replace('\u2028', '\n')
+        self._pending_deltas.append((position, removed, text))
+    
+    def _deltas_reproduce(self, content: str) -> bool:
+        """
+        Check whether the pending deltas are worth saving on their own.
+        They must be small next to the document, and replaying them on the
+        last saved text must give exactly the current content.
+        """
+        if not self._pending_deltas or self._last_saved_text is None:
+            return False
+        
+        added = sum(len(text) for _, _, text in self._pending_deltas)
+        if (added + self._delta_chars) * 4 > len(content):
+            return False
         
-        # Emit saved signal
-        signals.protocol_saved.emit(self.current_model, self.current_protocol, self.current_version)
+        text = self._last_saved_text
+        for position, removed, added_text in self._pending_deltas:
+            text = text[:position] + added_text + text[position + removed:]
+        return text == content
     
     def clear(self):
         """Clear the editor."""
+        self._load_generation += 1
         self._is_loading = True
         self.text_edit.clear()
         self.text_edit.setEnabled(False)
         self._is_loading = False
+        self._dirty = False
+        self._last_saved_text = None
+        self._last_saved_rev = -1
+        self._pending_deltas = []
+        self._delta_chars = 0
         self.current_model = None
         self.current_protocol = None
         self.current_version = None
@@ -1,15 +1,91 @@
 """
 Hierarchy dialog - drag and drop interface for reordering models and protocols.
 """
-from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QTreeWidget, 
-                             QTreeWidgetItem, QPushButton, QLabel)
-from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QTreeView,
+                             QAbstractItemView, QPushButton, QLabel)
+from PyQt5.QtGui import QStandardItemModel, QStandardItem
+from PyQt5.QtCore import Qt, QModelIndex, QTimer
 
-from .styles import get_tree_widget_stylesheet, get_button_stylesheet, get_label_stylesheet
+from .styles import get_button_stylesheet, get_label_stylesheet
 from .signals import signals
 from ..utils.storage import storage
 
 
+# Item role marking whether a model row has loaded its protocols yet
+FETCHED_ROLE = Qt.UserRole + 1
+
+
+class HierarchyModel(QStandardItemModel):
+    """
+    Item model holding models as top-level rows and their protocols as children.
+    Protocol rows are only loaded from storage when a model row is expanded.
+    """
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setHorizontalHeaderLabels(["Models and Protocols"])
+    
+    def _make_item(self, item_type: str, name: str) -> QStandardItem:
+        """Create a non-editable tree item tagged with its type."""
+        item = QStandardItem(name)
+        item.setEditable(False)
+        item.setData({'type': item_type, 'name': name}, Qt.UserRole)
+        return item
+    
+    def set_models(self, models: list):
+        """
+        Replace the model contents with one unexpanded row per model.
+        Rows are built detached and inserted in a single batch.
+        """
+        model_items = []
+        for model_name in models:
+            model_item = self._make_item('model', model_name)
+            model_item.setData(False, FETCHED_ROLE)
+            model_items.append(model_item)
+        
+        self.removeRows(0, self.rowCount())
+        self.invisibleRootItem().appendRows(model_items)
+    
+    def hasChildren(self, parent=QModelIndex()) -> bool:
+        """Report unloaded model rows as expandable."""
+        return self.canFetchMore(parent) or super().hasChildren(parent)
+    
+    def canFetchMore(self, parent) -> bool:
+        """Only model rows whose protocols have not been loaded can fetch more."""
+        if not parent.isValid() or parent.parent().isValid():
+            return False
+        return parent.data(FETCHED_ROLE) is False
+    
+    def fetchMore(self, parent):
+        """Load the protocols of a model row from storage."""
+        model_item = self.itemFromIndex(parent)
+        model_item.setData(True, FETCHED_ROLE)
+        protocols = storage.load_protocol_order(model_item.text())
+        if protocols:
+            model_item.appendRows([self._make_item('protocol', p) for p in protocols])
+    
+    def dropMimeData(self, data, action, row, column, parent) -> bool:
+        """Load a model's protocols before anything is dropped into it."""
+        if self.canFetchMore(parent):
+            self.fetchMore(parent)
+        return super().dropMimeData(data, action, row, column, parent)
+    
+    def hierarchy(self) -> list:
+        """
+        Return the current ordering as [(model_name, [protocol_names]), ...].
+        Models whose protocols were never loaded report None instead of a list.
+        """
+        result = []
+        for i in range(self.rowCount()):
+            model_item = self.item(i)
+            if model_item.data(FETCHED_ROLE) is False:
+                protocols = None
+            else:
+                protocols = [model_item.child(j).text() for j in range(model_item.rowCount())]
+            result.append((model_item.text(), protocols))
+        return result
+
+
 class HierarchyDialog(QDialog):
     """Dialog for managing model and protocol ordering via drag and drop."""
     
@@ -19,7 +95,13 @@ class HierarchyDialog(QDialog):
         self.setModal(True)
         self.resize(600, 500)
         self._setup_ui()
-        self._load_hierarchy()
+    
+    def showEvent(self, event):
+        """Reload the hierarchy each time the dialog is shown, so a reused dialog is current."""
+        super().showEvent(event)
+        
+        # Let the dialog paint its chrome before rows are built
+        QTimer.singleShot(0, self._load_hierarchy)
     
     def _setup_ui(self):
         """Set up the UI components."""
@@ -32,14 +114,15 @@ class HierarchyDialog(QDialog):
         info_label.setStyleSheet(get_label_stylesheet())
         layout.addWidget(info_label)
         
-        # Tree widget
-        self.tree_widget = QTreeWidget()
-        self.tree_widget.setStyleSheet(get_tree_widget_stylesheet())
-        self.tree_widget.setHeaderLabel("Models and Protocols")
-        self.tree_widget.setDragDropMode(QTreeWidget.InternalMove)
-        self.tree_widget.setSelectionMode(QTreeWidget.SingleSelection)
-        self.tree_widget.setExpandsOnDoubleClick(True)
-        layout.addWidget(self.tree_widget)
+        # Tree view backed by the hierarchy model
+        self.tree_model = HierarchyModel(self)
+        self.tree_view = QTreeView()
+        self.tree_view.setModel(self.tree_model)
+        self.tree_view.setDragDropMode(QAbstractItemView.InternalMove)
+        self.tree_view.setDefaultDropAction(Qt.MoveAction)
+        self.tree_view.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.tree_view.setExpandsOnDoubleClick(True)
+        layout.addWidget(self.tree_view)
         
         # Buttons
         button_layout = QHBoxLayout()
@@ -59,44 +142,21 @@ class HierarchyDialog(QDialog):
     
     def _load_hierarchy(self):
         """Load current hierarchy into the tree."""
-        self.tree_widget.clear()
-        
-        models = storage.load_models()
-        
-        for model in models:
-            model_item = QTreeWidgetItem([model])
-            model_item.setData(0, Qt.UserRole, {'type': 'model', 'name': model})
-            self.tree_widget.addTopLevelItem(model_item)
-            
-            protocols = storage.load_protocol_order(model)
-            for protocol in protocols:
-                protocol_item = QTreeWidgetItem([protocol])
-                protocol_item.setData(0, Qt.UserRole, {'type': 'protocol', 'name': protocol})
-                model_item.addChild(protocol_item)
-            
-            model_item.setExpanded(True)
+        # Protocols are fetched per model as rows are expanded
+        self.tree_model.set_models(storage.load_models())
     
     def _save_hierarchy(self):
         """Save the new hierarchy from the tree."""
-        # Extract new model order
-        models = []
-        for i in range(self.tree_widget.topLevelItemCount()):
-            model_item = self.tree_widget.topLevelItem(i)
-            model_name = model_item.text(0)
-            models.append(model_name)
-            
-            # Extract protocol order for this model
-            protocols = []
-            for j in range(model_item.childCount()):
-                protocol_item = model_item.child(j)
-                protocol_name = protocol_item.text(0)
-                protocols.append(protocol_name)
-            
-            # Save protocol order
-            storage.save_protocol_order(model_name, protocols)
+        # Extract new model order and protocol order per model
+        hierarchy = self.tree_model.hierarchy()
+        models = [model_name for model_name, _ in hierarchy]
+        
+        # Models never expanded keep their stored protocol order
+        protocol_orders = {model_name: protocols for model_name, protocols in hierarchy
+                           if protocols is not None}
         
-        # Save model order
-        storage.save_models(models)
+        # Persist the whole hierarchy at once
+        storage.save_hierarchy(models, protocol_orders)
         
         # Emit signal to refresh UI
         signals.hierarchy_changed.emit()
@@ -3,14 +3,23 @@ Main window - application entry point with layout and menu.
 """
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QHBoxLayout, 
                              QAction, QStatusBar)
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer, QRunnable, QThreadPool
 
-from .styles import get_main_window_stylesheet
 from .signals import signals
 from .models_panel import ModelsPanel
 from .protocols_panel import ProtocolsPanel
 from .editor_panel import EditorPanel
 from .hierarchy_dialog import HierarchyDialog
+from ..utils.storage import storage
+from ..utils.dialogs import show_error
+
+
+class _PreloadTask(QRunnable):
+    """Warms the storage caches with every model's protocol order."""
+    
+    def run(self):
+        """Load index.json off the GUI thread so later model switches hit the cache."""
+        storage.load_all_protocol_orders()
 
 
 class MainWindow(QMainWindow):
@@ -20,16 +29,26 @@ class MainWindow(QMainWindow):
         super().__init__()
         self.setWindowTitle("Protocol Clipboard Manager")
         self.resize(1200, 700)
+        
+        # Coalesces bursts of hierarchy_changed into a single panel refresh
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.setInterval(50)
+        self._refresh_timer.timeout.connect(self._do_refresh)
+        
+        # Created on first use and reused afterwards
+        self._hierarchy_dialog = None
+        
         self._setup_ui()
         self._setup_menu()
         self._setup_statusbar()
         self._connect_signals()
+        
+        # Read protocol orders in the background while the window comes up
+        QThreadPool.globalInstance().start(_PreloadTask())
     
     def _setup_ui(self):
         """Set up the main UI layout."""
-        # Apply stylesheet
-        self.setStyleSheet(get_main_window_stylesheet())
-        
         # Central widget with horizontal layout
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
@@ -48,8 +67,9 @@ class MainWindow(QMainWindow):
         layout.addWidget(self.protocols_panel, 1)
         layout.addWidget(self.editor_panel, 3)
         
-        # Select first model after all panels are connected
-        self.models_panel.select_first_model()
+        # Select first model after all panels are connected and the models
+        # panel has run its deferred initial load
+        QTimer.singleShot(0, self.models_panel.select_first_model)
     
     def _setup_menu(self):
         """Set up the menu bar."""
@@ -89,19 +109,40 @@ class MainWindow(QMainWindow):
     
     def _connect_signals(self):
         """Connect to application signals."""
-        signals.protocol_loaded.connect(self._on_protocol_loaded)
-        signals.hierarchy_changed.connect(self._on_hierarchy_changed)
+        # Queued so status/refresh work runs from the event loop, not inside the emitter
+        signals.protocol_loaded.connect(self._on_protocol_loaded, type=Qt.QueuedConnection)
+        signals.hierarchy_changed.connect(self._on_hierarchy_changed, type=Qt.QueuedConnection)
+        signals.protocol_save_failed.connect(self._on_protocol_save_failed, type=Qt.QueuedConnection)
+        self.models_panel.hierarchy_requested.connect(self._show_hierarchy_dialog)
     
     def _on_protocol_loaded(self, model_name: str, protocol_name: str, version: str):
         """Update status bar when protocol is loaded."""
         self.status_bar.showMessage(f"Copied '{protocol_name}' (v{version}) to clipboard")
     
+    def _on_protocol_save_failed(self, model_name: str, protocol_name: str, version: str, error: str):
+        """Tell the user a save did not reach the disk."""
+        self.status_bar.showMessage(f"Could not save '{protocol_name}' (v{version}): {error}")
+    
     def _on_hierarchy_changed(self):
-        """Refresh panels when hierarchy changes."""
+        """Schedule a panel refresh when hierarchy changes."""
+        self._refresh_timer.start()
+    
+    def _do_refresh(self):
+        """Refresh panels once after a burst of hierarchy changes."""
         self.models_panel.refresh()
         self.protocols_panel.refresh()
     
+    def closeEvent(self, event):
+        """Make sure pending edits reach disk before the window closes."""
+        self.editor_panel.save_and_cleanup()
+        try:
+            storage.flush()
+        except OSError as e:
+            show_error(self, "Save Failed", f"Some changes could not be saved: {e}")
+        super().closeEvent(event)
+    
     def _show_hierarchy_dialog(self):
-        """Show the hierarchy management dialog."""
-        dialog = HierarchyDialog(self)
-        dialog.exec_()
+        """Show the hierarchy management dialog; it reloads itself when shown."""
+        if self._hierarchy_dialog is None:
+            self._hierarchy_dialog = HierarchyDialog(self)
+        self._hierarchy_dialog.exec_()
@@ -1,12 +1,11 @@
 """
 Models panel - displays and manages the list of models.
 """
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QListWidget, QPushButton, QLabel
-from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QListView, QAbstractItemView, QPushButton, QLabel
+from PyQt5.QtCore import Qt, QStringListModel, QTimer, pyqtSignal
 
-from .styles import get_list_widget_stylesheet, get_button_stylesheet, get_label_stylesheet
-from .signals import signals
-from .hierarchy_dialog import HierarchyDialog
+from .styles import get_button_stylesheet, get_label_stylesheet
+from .signals import fast_bus
 from ..utils.storage import storage
 from ..utils.dialogs import get_text_input, confirm_action
 
@@ -14,11 +13,17 @@ from ..utils.dialogs import get_text_input, confirm_action
 class ModelsPanel(QWidget):
     """Panel for displaying and managing models."""
     
+    # Emitted when the user asks for the hierarchy dialog; the main window owns it
+    hierarchy_requested = pyqtSignal()
+    
     def __init__(self, parent=None):
         super().__init__(parent)
         self.current_model = None
+        self._index_by_name = {}
         self._setup_ui()
-        self._load_models()
+        
+        # Populate after the window has had a chance to paint
+        QTimer.singleShot(0, self._load_models)
     
     def _setup_ui(self):
         """Set up the UI components."""
@@ -31,14 +36,17 @@ class ModelsPanel(QWidget):
         label.setStyleSheet(get_label_stylesheet())
         layout.addWidget(label)
         
-        # List widget
-        self.list_widget = QListWidget()
-        self.list_widget.setStyleSheet(get_list_widget_stylesheet())
-        self.list_widget.itemClicked.connect(self._on_model_selected)
-        self.list_widget.itemDoubleClicked.connect(self._on_rename_model)
-        self.list_widget.setContextMenuPolicy(Qt.CustomContextMenu)
-        self.list_widget.customContextMenuRequested.connect(self._show_context_menu)
-        layout.addWidget(self.list_widget)
+        # List view over a plain string model
+        self._list_model = QStringListModel(self)
+        self.list_view = QListView()
+        self.list_view.setModel(self._list_model)
+        self.list_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.list_view.setUniformItemSizes(True)  # Single-line rows, no per-item size hints
+        self.list_view.selectionModel().currentChanged.connect(self._on_model_selected)
+        self.list_view.doubleClicked.connect(self._on_rename_model)
+        self.list_view.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.list_view.customContextMenuRequested.connect(self._show_context_menu)
+        layout.addWidget(self.list_view)
         
         # Add button
         add_button = QPushButton("+")
@@ -47,69 +55,98 @@ class ModelsPanel(QWidget):
         layout.addWidget(add_button)
     
     def _load_models(self):
-        """Load models from storage and populate the list."""
-        self.list_widget.clear()
-        models = storage.load_models()
-        self.list_widget.addItems(models)
+        """Load models from storage and populate the list in a single model reset."""
+        self._list_model.setStringList(storage.load_models())
+        self._index_by_name = {}
+        self._reindex()
+    
+    def _reindex(self, start: int = 0):
+        """Rebuild the name -> row lookup from the given row onwards."""
+        names = self._list_model.stringList()
+        for row in range(start, len(names)):
+            self._index_by_name[names[row]] = row
+    
+    def _select_row(self, row: int):
+        """Make a row current, emitting model_selected even if it already was."""
+        index = self._list_model.index(row)
+        if index == self.list_view.currentIndex():
+            self._on_model_selected(index)
+        else:
+            self.list_view.setCurrentIndex(index)
     
     def select_first_model(self):
         """Select the first model if available."""
-        if self.list_widget.count() > 0:
-            self.list_widget.setCurrentRow(0)
-            self._on_model_selected(self.list_widget.item(0))
+        if self._list_model.rowCount() > 0:
+            self._select_row(0)
     
-    def _on_model_selected(self, item):
+    def _on_model_selected(self, index):
         """Handle model selection."""
-        if item:
-            model_name = item.text()
+        if index.isValid():
+            model_name = index.data()
             self.current_model = model_name
-            signals.model_selected.emit(model_name)
+            fast_bus.model_selected.emit(model_name)
     
     def _on_add_model(self):
         """Handle adding a new model."""
         name, ok = get_text_input(self, "New Model", "Enter model name:")
         if ok and name:
             if storage.add_model(name):
-                self.list_widget.addItem(name)
+                row = self._list_model.rowCount()
+                self._list_model.insertRows(row, 1)
+                self._list_model.setData(self._list_model.index(row), name)
+                self._index_by_name[name] = row
                 # Select the newly added model
-                self.list_widget.setCurrentRow(self.list_widget.count() - 1)
-                self._on_model_selected(self.list_widget.item(self.list_widget.count() - 1))
+                self._select_row(row)
             else:
                 # Model already exists
                 pass
     
-    def _on_rename_model(self, item):
+    def _on_rename_model(self, index):
         """Handle renaming a model."""
-        if not item:
+        if not index.isValid():
             return
         
-        old_name = item.text()
+        old_name = index.data()
         new_name, ok = get_text_input(self, "Rename Model", "Enter new name:", old_name)
         
         if ok and new_name and new_name != old_name:
+            # Queued saves under the old name must land before its directory moves
+            fast_bus.flush_requested.emit()
             if storage.rename_model(old_name, new_name):
-                item.setText(new_name)
+                self._list_model.setData(index, new_name)
+                self._index_by_name[new_name] = self._index_by_name.pop(old_name)
                 if self.current_model == old_name:
                     self.current_model = new_name
-                    signals.model_selected.emit(new_name)
+                    fast_bus.model_selected.emit(new_name)
     
     def _on_delete_model(self):
         """Handle deleting a model."""
-        item = self.list_widget.currentItem()
-        if not item:
+        index = self.list_view.currentIndex()
+        if not index.isValid():
             return
         
-        model_name = item.text()
+        model_name = index.data()
         if confirm_action(self, "Delete Model", f"Delete model '{model_name}' and all its protocols?"):
+            # A save landing after the delete would recreate the model's directory
+            fast_bus.flush_requested.emit()
             if storage.delete_model(model_name):
-                row = self.list_widget.row(item)
-                self.list_widget.takeItem(row)
+                row = index.row()
+                
+                # Keep the selection model quiet while the current row goes away;
+                # the row picked below is announced once
+                selection_model = self.list_view.selectionModel()
+                selection_model.blockSignals(True)
+                try:
+                    self._list_model.removeRows(row, 1)
+                finally:
+                    selection_model.blockSignals(False)
+                del self._index_by_name[model_name]
+                self._reindex(row)
                 
                 # Select another model if available
-                if self.list_widget.count() > 0:
-                    new_row = min(row, self.list_widget.count() - 1)
-                    self.list_widget.setCurrentRow(new_row)
-                    self._on_model_selected(self.list_widget.item(new_row))
+                count = self._list_model.rowCount()
+                if count > 0:
+                    self._select_row(min(row, count - 1))
                 else:
                     self.current_model = None
     
@@ -117,8 +154,8 @@ class ModelsPanel(QWidget):
         """Show context menu for model operations."""
         from PyQt5.QtWidgets import QMenu
         
-        item = self.list_widget.itemAt(position)
-        if not item:
+        index = self.list_view.indexAt(position)
+        if not index.isValid():
             return
         
         menu = QMenu(self)
@@ -133,16 +170,16 @@ class ModelsPanel(QWidget):
         hierarchy_action = menu.addAction("Open Hierarchy")
         
         # Disable move up for first item, move down for last item
-        current_row = self.list_widget.row(item)
+        current_row = index.row()
         if current_row == 0:
             move_up_action.setEnabled(False)
-        if current_row == self.list_widget.count() - 1:
+        if current_row == self._list_model.rowCount() - 1:
             move_down_action.setEnabled(False)
         
-        action = menu.exec_(self.list_widget.mapToGlobal(position))
+        action = menu.exec_(self.list_view.mapToGlobal(position))
         
         if action == rename_action:
-            self._on_rename_model(item)
+            self._on_rename_model(index)
         elif action == delete_action:
             self._on_delete_model()
         elif action == move_up_action:
@@ -150,7 +187,7 @@ class ModelsPanel(QWidget):
         elif action == move_down_action:
             self._on_move_model_down()
         elif action == hierarchy_action:
-            self._on_open_hierarchy()
+            self.hierarchy_requested.emit()
     
     def refresh(self):
         """Refresh the models list after hierarchy changes."""
@@ -159,27 +196,25 @@ class ModelsPanel(QWidget):
         
         # Try to restore selection
         if current:
-            for i in range(self.list_widget.count()):
-                if self.list_widget.item(i).text() == current:
-                    self.list_widget.setCurrentRow(i)
-                    self._on_model_selected(self.list_widget.item(i))
-                    break
+            row = self._index_by_name.get(current)
+            if row is not None:
+                self._select_row(row)
         else:
             # No current selection, select first
             self.select_first_model()
     
     def _on_move_model_up(self):
         """Move the selected model up in the list."""
-        current_item = self.list_widget.currentItem()
-        if not current_item:
+        index = self.list_view.currentIndex()
+        if not index.isValid():
             return
         
-        current_row = self.list_widget.row(current_item)
+        current_row = index.row()
         if current_row == 0:
             return  # Already at top
         
         # Get current model name
-        model_name = current_item.text()
+        model_name = index.data()
         
         # Update models list
         models = storage.load_models()
@@ -190,24 +225,23 @@ class ModelsPanel(QWidget):
             
             # Refresh list and maintain selection
             self._load_models()
-            self.list_widget.setCurrentRow(current_row - 1)
-            self._on_model_selected(self.list_widget.item(current_row - 1))
+            self._select_row(current_row - 1)
         except (ValueError, IndexError):
             # Model not found in list or index error - just refresh
             self._load_models()
     
     def _on_move_model_down(self):
         """Move the selected model down in the list."""
-        current_item = self.list_widget.currentItem()
-        if not current_item:
+        index = self.list_view.currentIndex()
+        if not index.isValid():
             return
         
-        current_row = self.list_widget.row(current_item)
-        if current_row == self.list_widget.count() - 1:
+        current_row = index.row()
+        if current_row == self._list_model.rowCount() - 1:
             return  # Already at bottom
         
         # Get current model name
-        model_name = current_item.text()
+        model_name = index.data()
         
         # Update models list
         models = storage.load_models()
@@ -218,13 +252,8 @@ class ModelsPanel(QWidget):
             
             # Refresh list and maintain selection
             self._load_models()
-            self.list_widget.setCurrentRow(current_row + 1)
-            self._on_model_selected(self.list_widget.item(current_row + 1))
+            self._select_row(current_row + 1)
         except (ValueError, IndexError):
             # Model not found in list or index error - just refresh
             self._load_models()
-    
-    def _on_open_hierarchy(self):
-        """Open the hierarchy dialog."""
-        dialog = HierarchyDialog(self)
-        dialog.exec_()
+
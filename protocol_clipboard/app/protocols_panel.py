@@ -1,15 +1,109 @@
 """
 Protocols panel - displays and manages protocols for the selected model.
 """
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QListWidget, QPushButton, QLabel
-from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QListView, QAbstractItemView, QPushButton, QLabel, QMenu
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
 
-from .styles import get_list_widget_stylesheet, get_button_stylesheet, get_label_stylesheet
-from .signals import signals
+from .styles import get_button_stylesheet, get_label_stylesheet
+from .signals import signals, fast_bus
 from ..utils.storage import storage
 from ..utils.dialogs import get_text_input, confirm_action, show_error
 
 
+class ProtocolListModel(QAbstractListModel):
+    """
+    List model exposing a plain Python list of protocol names.
+    Keeps a name -> row index alongside the list for constant-time lookups.
+    """
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._items = []
+        self._rows = {}
+    
+    def rowCount(self, parent=QModelIndex()) -> int:
+        """Number of protocols; the list has no children."""
+        return 0 if parent.isValid() else len(self._items)
+    
+    def data(self, index, role=Qt.DisplayRole):
+        """Return the protocol name for display and edit roles."""
+        if index.isValid() and role in (Qt.DisplayRole, Qt.EditRole):
+            return self._items[index.row()]
+        return None
+    
+    def setData(self, index, value, role=Qt.EditRole) -> bool:
+        """Replace the protocol name at index."""
+        if not index.isValid() or role != Qt.EditRole:
+            return False
+        row = index.row()
+        if self._rows.get(self._items[row]) == row:
+            del self._rows[self._items[row]]
+        self._items[row] = value
+        self._rows[value] = row
+        self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.EditRole])
+        return True
+    
+    def insertRows(self, row: int, count: int, parent=QModelIndex()) -> bool:
+        """Insert count empty rows before row."""
+        self.beginInsertRows(parent, row, row + count - 1)
+        self._items[row:row] = [''] * count
+        self._reindex(row + count)
+        self.endInsertRows()
+        return True
+    
+    def removeRows(self, row: int, count: int, parent=QModelIndex()) -> bool:
+        """Remove count rows starting at row."""
+        self.beginRemoveRows(parent, row, row + count - 1)
+        for name in self._items[row:row + count]:
+            self._rows.pop(name, None)
+        del self._items[row:row + count]
+        self._reindex(row)
+        self.endRemoveRows()
+        return True
+    
+    def set_items(self, items: list):
+        """Swap in a new list of protocol names with a single model reset."""
+        self.beginResetModel()
+        self._items = list(items)
+        self._rows = {}
+        self._reindex(0)
+        self.endResetModel()
+    
+    def items(self) -> list:
+        """Return the protocol names in display order."""
+        return self._items
+    
+    def row_of(self, name: str):
+        """Return the row holding name, or None if it is not listed."""
+        return self._rows.get(name)
+    
+    def _reindex(self, start: int):
+        """Refresh the name -> row index for rows from start onwards."""
+        for row in range(start, len(self._items)):
+            self._rows[self._items[row]] = row
+
+
+class _LoadNotifier(QObject):
+    """Carries load completions from the pool thread back to the GUI thread."""
+    
+    loaded = pyqtSignal(int)
+
+
+class _LoadProtocolsTask(QRunnable):
+    """Reads a model's protocol order in the background so storage has it cached."""
+    
+    def __init__(self, request_id: int, model_name: str, notifier: _LoadNotifier):
+        super().__init__()
+        self.request_id = request_id
+        self.model_name = model_name
+        self.notifier = notifier
+    
+    def run(self):
+        """Load the order from disk and report back."""
+        storage.load_protocol_order(self.model_name)
+        self.notifier.loaded.emit(self.request_id)
+
+
 class ProtocolsPanel(QWidget):
     """Panel for displaying and managing protocols."""
     
@@ -18,6 +112,18 @@ class ProtocolsPanel(QWidget):
         self.current_model = None
         self.current_protocol = None
         self.current_version = None
+        self._needs_refresh = False
+        self._version_cache = {}
+        
+        # Latest model from a burst of model_selected, applied on the next event loop turn
+        self._pending_model = None
+        self._model_change_scheduled = False
+        
+        # Protocol order is read on a pool thread; only the latest request is applied
+        self._load_request = 0
+        self._restore_protocol = None
+        self._load_notifier = _LoadNotifier(self)
+        self._load_notifier.loaded.connect(self._on_protocols_loaded)
         self._setup_ui()
         self._connect_signals()
     
@@ -32,14 +138,17 @@ class ProtocolsPanel(QWidget):
         label.setStyleSheet(get_label_stylesheet())
         layout.addWidget(label)
         
-        # List widget
-        self.list_widget = QListWidget()
-        self.list_widget.setStyleSheet(get_list_widget_stylesheet())
-        self.list_widget.itemClicked.connect(self._on_protocol_selected)
-        self.list_widget.itemDoubleClicked.connect(self._on_rename_protocol)
-        self.list_widget.setContextMenuPolicy(Qt.CustomContextMenu)
-        self.list_widget.customContextMenuRequested.connect(self._show_context_menu)
-        layout.addWidget(self.list_widget)
+        # List view over the protocol names
+        self._list_model = ProtocolListModel(self)
+        self.list_view = QListView()
+        self.list_view.setModel(self._list_model)
+        self.list_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.list_view.setUniformItemSizes(True)  # Single-line rows, no per-item size hints
+        self.list_view.clicked.connect(self._on_protocol_selected)
+        self.list_view.doubleClicked.connect(self._on_rename_protocol)
+        self.list_view.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.list_view.customContextMenuRequested.connect(self._show_context_menu)
+        layout.addWidget(self.list_view)
         
         # Add button
         add_button = QPushButton("+")
@@ -48,42 +157,117 @@ class ProtocolsPanel(QWidget):
         add_button.setEnabled(False)  # Disabled until model is selected
         self.add_button = add_button
         layout.addWidget(add_button)
+        
+        self._setup_context_menu()
+    
+    def _setup_context_menu(self):
+        """Build the context menu once; only the version submenu changes per use."""
+        self._menu_protocol = None
+        self._context_menu = QMenu(self)
+        self._rename_action = self._context_menu.addAction("Rename")
+        self._delete_action = self._context_menu.addAction("Delete")
+        
+        # Add version management submenu
+        self._context_menu.addSeparator()
+        self._add_version_action = self._context_menu.addAction("Add Version")
+        
+        # Version selection submenu, filled in only if it is opened
+        self._version_menu = self._context_menu.addMenu("Select Version")
+        self._version_menu.aboutToShow.connect(self._populate_version_menu)
+        
+        # Set as current action
+        self._set_current_action = self._context_menu.addAction("Set Selected as Current")
     
     def _connect_signals(self):
         """Connect to application signals."""
-        signals.model_selected.connect(self._on_model_changed)
+        fast_bus.model_selected.connect(self._on_model_changed)
+        fast_bus.version_changed.connect(self._on_versions_changed)
+        signals.hierarchy_changed.connect(self._version_cache.clear)
     
     def _on_model_changed(self, model_name: str):
-        """Handle model selection change."""
-        self.current_model = model_name
+        """Handle model selection change; a burst of changes is applied once."""
+        self._pending_model = model_name
+        if not self._model_change_scheduled:
+            self._model_change_scheduled = True
+            QTimer.singleShot(0, self._apply_model_change)
+    
+    def _apply_model_change(self):
+        """Switch to the most recently selected model."""
+        self._model_change_scheduled = False
+        self.current_model = self._pending_model
         self.current_protocol = None
-        self._load_protocols()
+        self._restore_protocol = None
+        self._version_cache.clear()
         self.add_button.setEnabled(True)
+        
+        # Hidden: load once the panel is shown again
+        if not self.isVisible():
+            self._needs_refresh = True
+            return
+        
+        self._load_protocols()
+    
+    def showEvent(self, event):
+        """Catch up on a reload that was skipped while hidden."""
+        super().showEvent(event)
+        if self._needs_refresh:
+            self._needs_refresh = False
+            self.refresh()
     
     def _load_protocols(self):
-        """Load protocols for the current model."""
-        self.list_widget.clear()
-        
-        if not self.current_model:
+        """
+        Start loading protocols for the current model.
+        The list is emptied right away so rows of the previous model can't be
+        clicked, and filled by _on_protocols_loaded.
+        """
+        self._load_request += 1
+        self._list_model.set_items([])
+        if self.current_model:
+            task = _LoadProtocolsTask(self._load_request, self.current_model, self._load_notifier)
+            QThreadPool.globalInstance().start(task)
+    
+    def _on_protocols_loaded(self, request_id: int):
+        """Show the loaded protocols, unless a newer load has been started since."""
+        if request_id != self._load_request:
             return
         
-        protocols = storage.load_protocol_order(self.current_model)
-        self.list_widget.addItems(protocols)
+        # Read back through the cache so edits made meanwhile are included
+        self._list_model.set_items(storage.load_protocol_order(self.current_model))
+        
+        # Try to restore selection
+        current, self._restore_protocol = self._restore_protocol, None
+        if current:
+            row = self._list_model.row_of(current)
+            if row is not None:
+                self.list_view.setCurrentIndex(self._list_model.index(row))
+    
+    def _select_row(self, row: int):
+        """Make a row current and load its protocol."""
+        index = self._list_model.index(row)
+        self.list_view.setCurrentIndex(index)
+        self._on_protocol_selected(index)
     
-    def _on_protocol_selected(self, item):
+    def _on_protocol_selected(self, index):
         """Handle protocol selection."""
-        if item and self.current_model:
-            protocol_name = item.text()
-            self.current_protocol = protocol_name
+        if index.isValid() and self.current_model:
+            protocol_name = index.data()
             
-            # Ensure versioning is set up
-            storage.ensure_protocol_versions(self.current_model, protocol_name)
-            
-            # Get the current version
-            version = storage.get_current_version(self.current_model, protocol_name)
+            if protocol_name == self.current_protocol:
+                # Clicked again: versioning was set up on first selection,
+                # and the current version comes from the version cache
+                version = self._get_versions(protocol_name)[1]
+            else:
+                self.current_protocol = protocol_name
+                
+                # Ensure versioning is set up
+                storage.ensure_protocol_versions(self.current_model, protocol_name)
+                
+                # Get the current version
+                version = storage.get_current_version(self.current_model, protocol_name)
             self.current_version = version
             
-            signals.protocol_selected.emit(self.current_model, protocol_name, version)
+            # Still emitted on a repeat click so the editor copies it again
+            fast_bus.protocol_selected.emit(self.current_model, protocol_name, version)
     
     def _on_add_protocol(self):
         """Handle adding a new protocol."""
@@ -92,110 +276,121 @@ class ProtocolsPanel(QWidget):
         
         name, ok = get_text_input(self, "New Protocol", "Enter protocol name:")
         if ok and name:
+            # Storage sets up versioning for the new protocol itself
             if storage.add_protocol(self.current_model, name):
-                # Ensure versioning is set up for new protocol
-                storage.ensure_protocol_versions(self.current_model, name)
-                
-                self.list_widget.addItem(name)
+                row = self._list_model.rowCount()
+                self._list_model.insertRows(row, 1)
+                self._list_model.setData(self._list_model.index(row), name)
                 # Select the newly added protocol
-                self.list_widget.setCurrentRow(self.list_widget.count() - 1)
-                self._on_protocol_selected(self.list_widget.item(self.list_widget.count() - 1))
+                self._select_row(row)
             else:
                 # Protocol already exists
                 pass
     
-    def _on_rename_protocol(self, item):
+    def _on_rename_protocol(self, index):
         """Handle renaming a protocol."""
-        if not item or not self.current_model:
+        if not index.isValid() or not self.current_model:
             return
         
-        old_name = item.text()
+        old_name = index.data()
         new_name, ok = get_text_input(self, "Rename Protocol", "Enter new name:", old_name)
         
         if ok and new_name and new_name != old_name:
+            # Queued saves under the old name must land before its directory moves
+            fast_bus.flush_requested.emit()
             if storage.rename_protocol(self.current_model, old_name, new_name):
-                item.setText(new_name)
+                self._version_cache.pop((self.current_model, old_name), None)
+                self._list_model.setData(index, new_name)
                 if self.current_protocol == old_name:
                     self.current_protocol = new_name
-                    # Get current version and re-emit with new name
-                    version = storage.get_current_version(self.current_model, new_name)
-                    self.current_version = version
-                    signals.protocol_selected.emit(self.current_model, new_name, version)
+                
+                # Content is unchanged, so listeners only need the new name
+                fast_bus.protocol_renamed.emit(self.current_model, old_name, new_name)
     
     def _on_delete_protocol(self):
         """Handle deleting a protocol."""
-        item = self.list_widget.currentItem()
-        if not item or not self.current_model:
+        index = self.list_view.currentIndex()
+        if not index.isValid() or not self.current_model:
             return
         
-        protocol_name = item.text()
+        protocol_name = index.data()
         if confirm_action(self, "Delete Protocol", f"Delete protocol '{protocol_name}'?"):
+            # A save landing after the delete would recreate the protocol's directory
+            fast_bus.flush_requested.emit()
             if storage.delete_protocol(self.current_model, protocol_name):
-                row = self.list_widget.row(item)
-                self.list_widget.takeItem(row)
+                self._version_cache.pop((self.current_model, protocol_name), None)
+                row = index.row()
+                
+                # Keep the selection model quiet while the current row goes away;
+                # the row picked below is announced once
+                selection_model = self.list_view.selectionModel()
+                selection_model.blockSignals(True)
+                try:
+                    self._list_model.removeRows(row, 1)
+                finally:
+                    selection_model.blockSignals(False)
                 
                 # Select another protocol if available
-                if self.list_widget.count() > 0:
-                    new_row = min(row, self.list_widget.count() - 1)
-                    self.list_widget.setCurrentRow(new_row)
-                    self._on_protocol_selected(self.list_widget.item(new_row))
+                count = self._list_model.rowCount()
+                if count > 0:
+                    self._select_row(min(row, count - 1))
                 else:
                     self.current_protocol = None
     
     def _show_context_menu(self, position):
         """Show context menu for protocol operations."""
-        from PyQt5.QtWidgets import QMenu
-        
-        item = self.list_widget.itemAt(position)
-        if not item:
+        index = self.list_view.indexAt(position)
+        if not index.isValid():
             return
         
-        protocol_name = item.text()
-        
-        menu = QMenu(self)
-        rename_action = menu.addAction("Rename")
-        delete_action = menu.addAction("Delete")
-        
-        # Add version management submenu
-        menu.addSeparator()
-        add_version_action = menu.addAction("Add Version")
-        
-        # Create version selection submenu
-        version_menu = menu.addMenu("Select Version")
-        versions = storage.list_versions(self.current_model, protocol_name)
-        current_version = storage.get_current_version(self.current_model, protocol_name)
+        self._menu_protocol = index.data()
+        action = self._context_menu.exec_(self.list_view.mapToGlobal(position))
         
-        version_actions = {}
-        for version in versions:
-            version_text = f"{version}"
-            if version == current_version:
-                version_text += " (current)"
-            version_action = version_menu.addAction(version_text)
-            version_actions[version_action] = version
-        
-        # Set as current action
-        set_current_action = menu.addAction("Set Selected as Current")
-        
-        action = menu.exec_(self.list_widget.mapToGlobal(position))
-        
-        if action == rename_action:
-            self._on_rename_protocol(item)
-        elif action == delete_action:
+        if action == self._rename_action:
+            self._on_rename_protocol(index)
+        elif action == self._delete_action:
             self._on_delete_protocol()
-        elif action == add_version_action:
+        elif action == self._add_version_action:
             self._on_add_version()
-        elif action == set_current_action:
+        elif action == self._set_current_action:
             self._on_set_current_version()
-        elif action in version_actions:
+        elif action is not None and action.data() is not None:
             # User selected a specific version
-            selected_version = version_actions[action]
-            self._on_version_selected(selected_version)
+            self._on_version_selected(action.data())
+    
+    def _populate_version_menu(self):
+        """
+        Fill the version submenu for the right-clicked protocol.
+        Each action carries its version as data.
+        """
+        self._version_menu.clear()
+        versions, current_version = self._get_versions(self._menu_protocol)
+        for version in versions:
+            version_text = f"{version}"
+            if version == current_version:
+                version_text += " (current)"
+            self._version_menu.addAction(version_text).setData(version)
+    
+    def _get_versions(self, protocol_name: str) -> tuple:
+        """Return (versions, current_version) for a protocol, cached until versions change."""
+        key = (self.current_model, protocol_name)
+        if key not in self._version_cache:
+            self._version_cache[key] = storage.get_versions_info(self.current_model, protocol_name)
+        return self._version_cache[key]
+    
+    def _on_versions_changed(self, model_name: str, protocol_name: str, version: str):
+        """Drop cached versions of a protocol whose versions changed."""
+        self._version_cache.pop((model_name, protocol_name), None)
     
     def _on_add_version(self):
         """Handle adding a new version to the current protocol."""
         if not self.current_model or not self.current_protocol:
             return
         
+        # Pending edits must land first: creating the version compacts the
+        # base version's delta log, which a queued save may still append to
+        fast_bus.flush_requested.emit()
+        
         # Create new version (copies from current version)
         new_version = storage.create_new_version(
             self.current_model, 
@@ -204,9 +399,11 @@ class ProtocolsPanel(QWidget):
         )
         
         if new_version:
+            self._version_cache.pop((self.current_model, self.current_protocol), None)
+            
             # Emit signal to load the new version
             self.current_version = new_version
-            signals.protocol_selected.emit(self.current_model, self.current_protocol, new_version)
+            fast_bus.protocol_selected.emit(self.current_model, self.current_protocol, new_version)
         else:
             # Show error if version creation failed
             show_error(
@@ -222,7 +419,7 @@ class ProtocolsPanel(QWidget):
             return
         
         self.current_version = version
-        signals.protocol_selected.emit(self.current_model, self.current_protocol, version)
+        fast_bus.protocol_selected.emit(self.current_model, self.current_protocol, version)
     
     def _on_set_current_version(self):
         """Set the currently selected version as the default/current."""
@@ -230,19 +427,17 @@ class ProtocolsPanel(QWidget):
             return
         
         storage.set_current_version(self.current_model, self.current_protocol, self.current_version)
-        signals.version_changed.emit(self.current_model, self.current_protocol, self.current_version)
+        fast_bus.version_changed.emit(self.current_model, self.current_protocol, self.current_version)
     
     def refresh(self):
         """Refresh the protocols list after hierarchy changes."""
         if not self.current_model:
             return
         
-        current = self.current_protocol
-        self._load_protocols()
+        if not self.isVisible():
+            self._needs_refresh = True
+            return
         
-        # Try to restore selection
-        if current:
-            for i in range(self.list_widget.count()):
-                if self.list_widget.item(i).text() == current:
-                    self.list_widget.setCurrentRow(i)
-                    break
+        # Selection is restored once the reload completes
+        self._restore_protocol = self.current_protocol
+        self._load_protocols()
@@ -1,6 +1,7 @@
 """
 Centralized signals for communication between components.
-Uses Qt signals for type-safe event handling.
+Uses Qt signals for type-safe event handling, and a plain callback bus for
+hot signals whose senders and receivers all live on the GUI thread.
 """
 from PyQt5.QtCore import QObject, pyqtSignal
 
@@ -8,28 +9,67 @@ from PyQt5.QtCore import QObject, pyqtSignal
 class AppSignals(QObject):
     """Centralized signals for the application."""
     
-    # Emitted when a model is selected (model_name)
-    model_selected = pyqtSignal(str)
-    
-    # Emitted when a protocol is selected (model_name, protocol_name, version)
-    protocol_selected = pyqtSignal(str, str, str)
-    
     # Emitted when a protocol is loaded (model_name, protocol_name, version)
     protocol_loaded = pyqtSignal(str, str, str)
     
     # Emitted when a protocol is saved (model_name, protocol_name, version)
     protocol_saved = pyqtSignal(str, str, str)
     
+    # Emitted when saving a protocol failed (model_name, protocol_name, version, error)
+    protocol_save_failed = pyqtSignal(str, str, str, str)
+    
     # Deprecated: Kept for backward compatibility, but no longer emitted for load/save operations
     # Use protocol_loaded and protocol_saved instead
     protocol_updated = pyqtSignal(str, str, str, str)
     
-    # Emitted when a version is changed for a protocol (model_name, protocol_name, version)
-    version_changed = pyqtSignal(str, str, str)
-    
     # Emitted when hierarchy (ordering) changes
     hierarchy_changed = pyqtSignal()
 
 
-# Global signals instance
+class FastSignal:
+    """
+    Same-thread stand-in for pyqtSignal: emit() calls the connected callbacks
+    directly instead of going through Qt's meta-object system.
+    """
+    
+    def __init__(self):
+        self._callbacks = []
+    
+    def connect(self, callback):
+        """Register a callback."""
+        self._callbacks.append(callback)
+    
+    def disconnect(self, callback):
+        """Unregister a previously connected callback."""
+        self._callbacks.remove(callback)
+    
+    def emit(self, *args):
+        """Call every connected callback in connection order."""
+        for callback in self._callbacks:
+            callback(*args)
+
+
+class FastBus:
+    """Signals that never cross threads, dispatched as plain method calls."""
+    
+    def __init__(self):
+        # Emitted when a model is selected (model_name)
+        self.model_selected = FastSignal()
+        
+        # Emitted when a protocol is selected (model_name, protocol_name, version)
+        self.protocol_selected = FastSignal()
+        
+        # Emitted when a protocol is renamed (model_name, old_name, new_name)
+        self.protocol_renamed = FastSignal()
+        
+        # Emitted when a version is changed for a protocol (model_name, protocol_name, version)
+        self.version_changed = FastSignal()
+        
+        # Emitted before storage changes that must not race queued editor saves (no arguments);
+        # receivers write out pending edits and wait for them to land
+        self.flush_requested = FastSignal()
+
+
+# Global signals instances
 signals = AppSignals()
+fast_bus = FastBus()
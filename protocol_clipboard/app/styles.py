@@ -1,7 +1,9 @@
 """
 Styling constants and stylesheets for the application.
 Defines color palette and Qt stylesheets with dark theme.
+Stylesheets are built on first use and the same string is returned afterwards.
 """
+from functools import lru_cache
 
 # Color constants
 BLACK_BG = "#0b0b0d"
@@ -13,6 +15,7 @@ TEXT_MUTED = "#a0a0a0"
 BORDER = "#2a2a30"
 
 
+@lru_cache(maxsize=None)
 def get_main_window_stylesheet() -> str:
     """Return stylesheet for the main window."""
     return f"""
@@ -43,10 +46,11 @@ def get_main_window_stylesheet() -> str:
     """
 
 
+@lru_cache(maxsize=None)
 def get_list_widget_stylesheet() -> str:
     """Return stylesheet for list widgets (models and protocols panels)."""
     return f"""
-    QListWidget {{
+    QListView {{
         background-color: {PANEL_BG};
         color: {TEXT_PRIMARY};
         border: 1px solid {BORDER};
@@ -54,21 +58,22 @@ def get_list_widget_stylesheet() -> str:
         padding: 4px;
         outline: none;
     }}
-    QListWidget::item {{
+    QListView::item {{
         padding: 8px;
         border-radius: 4px;
         margin: 2px 0;
     }}
-    QListWidget::item:selected {{
+    QListView::item:selected {{
         background-color: {ACCENT};
         color: {TEXT_PRIMARY};
     }}
-    QListWidget::item:hover {{
+    QListView::item:hover {{
         background-color: {ACCENT};
     }}
     """
 
 
+@lru_cache(maxsize=None)
 def get_text_edit_stylesheet() -> str:
     """Return stylesheet for the text editor."""
     return f"""
@@ -85,6 +90,7 @@ def get_text_edit_stylesheet() -> str:
     """
 
 
+@lru_cache(maxsize=None)
 def get_button_stylesheet() -> str:
     """Return stylesheet for buttons."""
     return f"""
@@ -105,6 +111,7 @@ def get_button_stylesheet() -> str:
     """
 
 
+@lru_cache(maxsize=None)
 def get_label_stylesheet() -> str:
     """Return stylesheet for labels."""
     return f"""
@@ -118,25 +125,26 @@ def get_label_stylesheet() -> str:
     """
 
 
+@lru_cache(maxsize=None)
 def get_tree_widget_stylesheet() -> str:
-    """Return stylesheet for tree widget in hierarchy dialog."""
+    """Return stylesheet for the tree view in hierarchy dialog."""
     return f"""
-    QTreeWidget {{
+    QTreeView {{
         background-color: {PANEL_BG};
         color: {TEXT_PRIMARY};
         border: 1px solid {BORDER};
         border-radius: 6px;
         outline: none;
     }}
-    QTreeWidget::item {{
+    QTreeView::item {{
         padding: 6px;
         border-radius: 3px;
     }}
-    QTreeWidget::item:selected {{
+    QTreeView::item:selected {{
         background-color: {ACCENT};
         color: {TEXT_PRIMARY};
     }}
-    QTreeWidget::item:hover {{
+    QTreeView::item:hover {{
         background-color: {ACCENT};
     }}
     QHeaderView::section {{
@@ -149,6 +157,7 @@ def get_tree_widget_stylesheet() -> str:
     """
 
 
+@lru_cache(maxsize=None)
 def get_dialog_stylesheet() -> str:
     """Return stylesheet for dialogs."""
     return f"""
@@ -162,3 +171,14 @@ def get_dialog_stylesheet() -> str:
         background-color: {BLACK_BG};
     }}
     """
+
+
+@lru_cache(maxsize=None)
+def get_application_stylesheet() -> str:
+    """
+    Return the stylesheet set once on the application.
+    Label and button rules stay per widget so the stock input and message
+    dialogs keep their default look.
+    """
+    return (get_main_window_stylesheet() + get_list_widget_stylesheet()
+            + get_text_edit_stylesheet() + get_tree_widget_stylesheet())
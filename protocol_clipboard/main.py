@@ -5,12 +5,14 @@ import sys
 from PyQt5.QtWidgets import QApplication
 
 from .app.main_window import MainWindow
+from .app.styles import get_application_stylesheet
 
 
 def main():
     """Launch the application."""
     app = QApplication(sys.argv)
     app.setApplicationName("Protocol Clipboard Manager")
+    app.setStyleSheet(get_application_stylesheet())
     
     window = MainWindow()
     window.show()
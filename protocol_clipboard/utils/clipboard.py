@@ -1,8 +1,26 @@
 """Clipboard utility for copying text to system clipboard."""
 from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QTimer
+
+# Text waiting to be written on the next event loop turn
+_pending_text = None
 
 
 def copy(text: str):
-    """Copy text to system clipboard."""
-    clipboard = QApplication.clipboard()
-    clipboard.setText(text)
+    """
+    Copy text to system clipboard.
+    The write happens on the next event loop turn; copies made before then
+    are coalesced so only the last text reaches the clipboard.
+    """
+    global _pending_text
+    if _pending_text is None:
+        QTimer.singleShot(0, _flush)
+    _pending_text = text
+
+
+def _flush():
+    """Write the latest pending text to the clipboard."""
+    global _pending_text
+    text, _pending_text = _pending_text, None
+    if text is not None:
+        QApplication.clipboard().setText(text)
@@ -2,11 +2,126 @@
 Storage utility for managing models and protocols data.
 Handles JSON files and protocol text files with automatic directory creation.
 """
+import atexit
 import json
 import os
+import queue
 import shutil
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Set, Tuple
+
+try:
+    import orjson
+except ImportError:  # Optional speedup; stdlib json is used without it
+    orjson = None
+
+# Upper bound on threads used to read a model's protocols in parallel
+BULK_READ_WORKERS = 8
+
+# Number of protocol texts kept in memory between reads
+CONTENT_CACHE_SIZE = 64
+
+# Files at least this large are read with a sequential readahead hint
+READAHEAD_HINT_BYTES = 64 * 1024
+
+# Marker in the names of directories set aside by _discard_directory
+_DISCARDED_MARKER = '.deleted-'
+
+# index.json is rewritten once its journal grows past this many times its size
+INDEX_JOURNAL_MAX_GROWTH = 4
+
+
+def _json_dumps(obj: Any, indent: bool = False) -> bytes:
+    """Serialize obj to compact UTF-8 JSON bytes, or indented by two spaces if asked."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def _json_loads(data: bytes) -> Any:
+    """Parse JSON from bytes."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+@lru_cache(maxsize=4096)
+def _data_path(base_path: Path, *parts: str) -> Path:
+    """Join parts onto base_path, reusing the Path built for the same parts before."""
+    return base_path.joinpath(*parts)
+
+
+@lru_cache(maxsize=1024)
+def _parse_version_tuple(version: str) -> Tuple[int, int]:
+    """
+    Parse version string to tuple for comparison.
+    Returns (major, minor) or (0, 0) for invalid versions. Version strings
+    repeat constantly, so parsed results are memoized.
+    """
+    major, sep, rest = version.partition('.')
+    try:
+        return int(major), int(rest.partition('.')[0]) if sep else 0
+    except ValueError:
+        return 0, 0
+
+
+def _journal_path(path: Path) -> Path:
+    """Get the JSONL journal holding additions not yet folded into a JSON file."""
+    return path.with_suffix('.jsonl')
+
+
+def _append_bytes(path: Path, data: bytes):
+    """Append data to path with a single O_APPEND write, creating the file if needed."""
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, 'O_BINARY', 0), 0o666)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+def _read_sequential(path: Path) -> bytes:
+    """Read a whole file, telling the kernel it will be read front to back."""
+    with open(path, 'rb') as f:
+        os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        return f.read()
+
+
+def _atomic_write(path: Path, data: bytes, durable: bool = False):
+    """
+    Write data to a temp file with raw os.write calls and os.replace it over
+    path, so a crash never leaves a half-written file behind. Only durable
+    writes fsync the file and then its directory.
+    """
+    # Per-thread temp name: the save thread and the UI thread may both write.
+    # The process id lets a later run tell abandoned temp files from live ones
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o666)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+        if durable:
+            os.fsync(fd)
+    finally:
+        os.close(fd)
+    os.replace(tmp_path, path)
+    
+    # Directory sync makes the rename itself durable where the OS allows it
+    if durable and hasattr(os, 'O_DIRECTORY'):
+        dir_fd = os.open(path.parent, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
 
 
 class StorageManager:
@@ -19,8 +134,298 @@ class StorageManager:
             package_dir = Path(__file__).parent.parent
             base_path = package_dir / "data"
         self.base_path = Path(base_path)
-        self.models_file = self.base_path / "models.json"
+        self.index_file = self.base_path / "index.json"
+        
+        # Parsed index.json contents, loaded whole on first use and kept in sync by the save methods;
+        # name lists are held as insertion-ordered dicts for O(1) membership tests
+        self._models_cache: Optional[Dict[str, None]] = None
+        self._order_cache: Dict[str, Dict[str, None]] = {}
+        self._versions_cache: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        
+        # Additions appended to index.jsonl rather than rewriting index.json. Journal
+        # lines carry the generation of the index.json they extend, and the
+        # generation moves on whenever index.json is rewritten over a journal
+        self._journal_size = 0
+        self._journal_generation = 0
+        self._index_size = 0
+        
+        # Model directories already created this session
+        self._dirs_created: Set[str] = set()
+        
+        # Delta logs known not to exist, so reads need not probe for them, and
+        # logs known to end on a complete line, so appends need not compact first
+        self._delta_free: Set[Path] = set()
+        self._delta_clean: Set[Path] = set()
+        
+        # Per version file locks, so delta appends never race compaction
+        self._version_locks: Dict[Path, threading.RLock] = {}
+        
+        # Models and protocol orders are also loaded from pool threads
+        self._cache_lock = threading.RLock()
+        
+        # Serialized JSON held back by batch(), keyed by path
+        self._batch_depth = 0
+        self._deferred_data: Dict[Path, bytes] = {}
+        
+        # Serialized JSON last written to each path, so unchanged saves are skipped
+        self._written_json: Dict[Path, bytes] = {}
+        
+        # JSON handed to the background writer: latest (data, durable) per path,
+        # with each path queued once until its write lands. Data is None when
+        # only journal lines are waiting to be appended
+        self._pending_writes: Dict[Path, Tuple[Optional[bytes], bool]] = {}
+        self._pending_appends: Dict[Path, List[bytes]] = {}
+        self._write_queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._writes_done = threading.Condition(self._cache_lock)
+        # Why the last write of each path failed, until reported by flush() or _await_write
+        self._write_errors: Dict[Path, OSError] = {}
+        self._writer: Optional[threading.Thread] = None
+        atexit.register(self.flush)
+        
+        # Text file contents keyed by path, valid while (mtime_ns, size) matches;
+        # least frequently read entries are evicted first
+        self._content_cache: Dict[Path, Tuple[Tuple[int, int], str]] = {}
+        self._content_hits: Dict[Path, int] = {}
+        
         self._ensure_directories()
+        
+        # Finish removing anything set aside for deletion, or left half
+        # written, before the last exit
+        self._start_removal(self._sweep_leftovers)
+    
+    def _load_json(self, path: Path) -> Any:
+        """Read and parse a JSON file, seeing writes still deferred or queued."""
+        with self._cache_lock:
+            data = self._deferred_data.get(path)
+            if data is None and path in self._pending_writes:
+                data = self._pending_writes[path][0]
+        if data is None:
+            data = path.read_bytes()
+        return _json_loads(data)
+    
+    def _dump_json(self, path: Path, obj: Any, durable: bool = False, pretty: bool = False) -> bytes:
+        """
+        Serialize obj compactly (indented if pretty), queue it for writing to
+        path and return the serialized bytes. Inside batch() the write is
+        deferred unless it is durable; durable writes are on disk before this
+        returns.
+        """
+        data = _json_dumps(obj, indent=pretty)
+        self._write_json(path, data, durable)
+        return data
+    
+    def _write_json(self, path: Path, data: bytes, durable: bool = False):
+        """
+        Write already serialized JSON, honouring batch() like _dump_json.
+        Data identical to what the file already holds is not written again,
+        unless it is only queued or deferred and this write is durable.
+        """
+        with self._cache_lock:
+            if data == self._deferred_data.get(path, self._written_json.get(path)) and not (
+                    durable and (path in self._pending_writes or path in self._deferred_data)):
+                return
+            if self._batch_depth and not durable:
+                self._deferred_data[path] = data
+                return
+            self._deferred_data.pop(path, None)
+            self._queue_write(path, data, durable)
+            if durable:
+                self._await_write(path)
+    
+    def _await_write(self, path: Path):
+        """
+        Block until the writer thread has nothing left queued for path, and
+        raise the OSError its last write failed with, if any.
+        """
+        with self._writes_done:
+            self._writes_done.wait_for(lambda: path not in self._pending_writes)
+            error = self._write_errors.pop(path, None)
+        if error is not None:
+            raise error
+    
+    def _queue_write(self, path: Path, data: bytes, durable: bool):
+        """Hand data to the writer thread, replacing any not yet written for path."""
+        with self._cache_lock:
+            previous = self._pending_writes.get(path)
+            # A superseded durable write keeps the replacement durable
+            self._pending_writes[path] = (data, durable or (previous is not None and previous[1]))
+            self._written_json[path] = data
+            # The new contents already include anything still waiting to be journaled
+            self._pending_appends.pop(path, None)
+            if previous is None:
+                self._write_queue.put(path)
+            self._start_writer()
+    
+    def _queue_append(self, path: Path, line: bytes):
+        """Hand a line for path's journal to the writer thread."""
+        with self._cache_lock:
+            # The file no longer describes the whole state on its own
+            self._written_json.pop(path, None)
+            self._pending_appends.setdefault(path, []).append(line)
+            if path not in self._pending_writes:
+                self._pending_writes[path] = (None, False)
+                self._write_queue.put(path)
+            self._start_writer()
+    
+    def _start_writer(self):
+        """Start the writer thread on first use."""
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._write_pending, daemon=True)
+            self._writer.start()
+    
+    def _write_pending(self):
+        """
+        Writer thread: write the latest data for each queued path, which
+        empties its journal, then append any journal lines that followed it.
+        """
+        while True:
+            path = self._write_queue.get()
+            with self._cache_lock:
+                data, durable = self._pending_writes[path]
+                lines = self._pending_appends.pop(path, None)
+            try:
+                if data is not None:
+                    _atomic_write(path, data, durable)
+                    _journal_path(path).unlink(missing_ok=True)
+                if lines:
+                    _append_bytes(_journal_path(path), b''.join(lines))
+            except OSError as e:
+                error = e
+            else:
+                error = None
+            
+            with self._cache_lock:
+                pending = self._pending_writes[path]
+                if pending[0] is not data or path in self._pending_appends:
+                    # Newer data or lines arrived while writing; write those next
+                    if pending[0] is data:
+                        self._pending_writes[path] = (None, pending[1])
+                    self._write_queue.put(path)
+                    continue
+                del self._pending_writes[path]
+                if error is None:
+                    self._write_errors.pop(path, None)
+                else:
+                    self._write_errors[path] = error
+                    if self._written_json.get(path) is data:
+                        # Let the next save of the same data try again
+                        del self._written_json[path]
+                self._writes_done.notify_all()
+    
+    def flush(self):
+        """
+        Block until every deferred and queued JSON write has reached the disk.
+        Raises the OSError of a write that failed since the last flush.
+        """
+        self._flush_deferred()
+        with self._writes_done:
+            self._writes_done.wait_for(lambda: not self._pending_writes)
+            errors, self._write_errors = self._write_errors, {}
+        if errors:
+            raise next(iter(errors.values()))
+    
+    @contextmanager
+    def batch(self):
+        """
+        Defer JSON writes until the outermost batch exits, so a file changed
+        several times is only written once. Cached contents stay current.
+        """
+        with self._cache_lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._cache_lock:
+                self._batch_depth -= 1
+                if not self._batch_depth:
+                    self._flush_deferred()
+    
+    def _flush_deferred(self):
+        """Queue any JSON held back by batch() for writing."""
+        with self._cache_lock:
+            pending, self._deferred_data = self._deferred_data, {}
+            for path, data in pending.items():
+                self._queue_write(path, data, False)
+    
+    def _read_text(self, path: Path) -> str:
+        """
+        Read a UTF-8 text file in one read, translating line endings like text
+        mode. Unchanged files are served from the content cache.
+        """
+        st = path.stat()
+        stamp = (st.st_mtime_ns, st.st_size)
+        with self._cache_lock:
+            cached = self._content_cache.get(path)
+            if cached is not None and cached[0] == stamp:
+                self._content_hits[path] += 1
+                return cached[1]
+        
+        if st.st_size >= READAHEAD_HINT_BYTES and hasattr(os, 'posix_fadvise'):
+            data = _read_sequential(path)
+        else:
+            data = path.read_bytes()
+        text = data.decode('utf-8')
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        self._cache_content(path, stamp, text)
+        return text
+    
+    def _write_text(self, path: Path, content: str, durable: bool = False):
+        """
+        Encode content as UTF-8 and write it in one write, translating line
+        endings to os.linesep like text mode does.
+        """
+        text = content if os.linesep == '\n' else content.replace('\n', os.linesep)
+        _atomic_write(path, text.encode('utf-8'), durable)
+        st = path.stat()
+        self._cache_content(path, (st.st_mtime_ns, st.st_size), content)
+    
+    def _cache_content(self, path: Path, stamp: Tuple[int, int], text: str):
+        """Remember a file's text, evicting the least read entry when full."""
+        with self._cache_lock:
+            if path not in self._content_cache and len(self._content_cache) >= CONTENT_CACHE_SIZE:
+                coldest = min(self._content_hits, key=self._content_hits.get)
+                del self._content_cache[coldest]
+                del self._content_hits[coldest]
+            self._content_cache[path] = (stamp, text)
+            self._content_hits[path] = self._content_hits.get(path, 0) + 1
+    
+    def _start_removal(self, target, *args, **kwargs):
+        """Run a removal job on a daemon thread so callers never wait on it."""
+        threading.Thread(target=target, args=args, kwargs=kwargs, daemon=True).start()
+    
+    def _discard_directory(self, path: Path):
+        """
+        Remove a directory tree. It is renamed aside at once, so it disappears
+        from view immediately, and deleted on a background thread.
+        """
+        discarded = path.with_name(f".{path.name}{_DISCARDED_MARKER}{uuid.uuid4().hex}")
+        try:
+            path.rename(discarded)
+        except FileNotFoundError:
+            return
+        self._start_removal(shutil.rmtree, discarded, ignore_errors=True)
+    
+    def _sweep_leftovers(self):
+        """
+        Delete directories left set aside, and temp files left behind by a
+        crash before their os.replace, by an earlier run.
+        """
+        pattern = f".*{_DISCARDED_MARKER}*"
+        for path in [*self.base_path.glob(pattern), *self.base_path.glob(f"*/{pattern}")]:
+            shutil.rmtree(path, ignore_errors=True)
+        
+        # Only names of the form {name}.{pid}.{thread id}.tmp are _atomic_write's,
+        # and those with this process id may be writes still in progress
+        pid = str(os.getpid())
+        for depth in ("", "*/", "*/*/"):
+            for path in self.base_path.glob(f"{depth}*.*.*.tmp"):
+                _, tmp_pid, tid, _ = path.name.rsplit('.', 3)
+                if tmp_pid.isdigit() and tid.isdigit() and tmp_pid != pid and path.is_file():
+                    try:
+                        path.unlink()
+                    except OSError:
+                        pass
     
     def _ensure_directories(self):
         """Ensure base data directory exists."""
@@ -29,119 +434,305 @@ class StorageManager:
     def _ensure_model_directory(self, model_name: str):
         """Ensure model-specific directory exists."""
         model_path = self.base_path / model_name
-        model_path.mkdir(parents=True, exist_ok=True)
+        if model_name not in self._dirs_created:
+            model_path.mkdir(parents=True, exist_ok=True)
+            self._dirs_created.add(model_name)
         return model_path
     
-    def load_models(self) -> List[str]:
-        """Load list of models from models.json, return in stored order."""
-        if not self.models_file.exists():
-            # Create default models.json with sample models
-            default_models = ["chatgpt", "claude", "copilot"]
-            self.save_models(default_models)
-            # Create default data for each model
-            for model in default_models:
-                self._ensure_model_directory(model)
-                self.save_protocol_order(model, [])
-            return default_models
+    def _move_cached_model(self, old_name: str, new_name: Optional[str] = None):
+        """Re-key cached state for a model, or drop it if new_name is None."""
+        with self._cache_lock:
+            # Moved files may bring delta logs to paths believed free of them
+            self._delta_free.clear()
+            self._delta_clean.clear()
+            self._dirs_created.discard(old_name)
+            order = self._order_cache.pop(old_name, None)
+            if new_name is not None and order is not None:
+                self._order_cache[new_name] = order
+            for key in [k for k in self._versions_cache if k[0] == old_name]:
+                data = self._versions_cache.pop(key)
+                if new_name is not None:
+                    self._versions_cache[(new_name, key[1])] = data
+    
+    def _move_cached_protocol(self, model_name: str, old_name: str, new_name: Optional[str] = None):
+        """Re-key cached state for a protocol, or drop it if new_name is None."""
+        with self._cache_lock:
+            self._delta_free.clear()
+            self._delta_clean.clear()
+            data = self._versions_cache.pop((model_name, old_name), None)
+            if new_name is not None and data is not None:
+                self._versions_cache[(model_name, new_name)] = data
+    
+    def _ensure_index(self):
+        """
+        Load index.json into the caches on first use. Models, protocol orders
+        and version metadata all come from this one file.
+        """
+        with self._cache_lock:
+            if self._models_cache is not None:
+                return
+            
+            try:
+                data = self._load_json(self.index_file)
+            except FileNotFoundError:
+                self._migrate_to_index()
+                return
+            except (json.JSONDecodeError, IOError):
+                data = {}
+            
+            self._models_cache = dict.fromkeys(data.get('models', []))
+            self._order_cache = {model: dict.fromkeys(protocols)
+                                 for model, protocols in data.get('protocols', {}).items()}
+            self._versions_cache = {}
+            for key, versions_data in data.get('versions', {}).items():
+                model_name, _, protocol_name = key.partition('/')
+                versions_data['versions'] = self._sort_versions(versions_data.get('versions', []))
+                self._versions_cache[(model_name, protocol_name)] = versions_data
+            self._journal_generation = data.get('generation', 0)
+            try:
+                self._index_size = self.index_file.stat().st_size
+            except OSError:
+                pass
+            self._replay_index_journal()
+    
+    def _replay_index_journal(self):
+        """
+        Apply the additions journaled in index.jsonl on top of the loaded
+        index. The journal is streamed a line at a time. Lines from an older
+        generation were already folded into index.json. An unterminated last
+        line, torn by a crash mid-append, is ignored, and the journal is
+        folded into index.json at once so nothing is appended onto it.
+        """
+        try:
+            journal = open(_journal_path(self.index_file), 'rb')
+        except IOError:
+            return  # No journal, or none that can be read
         
+        torn = False
+        with journal:
+            for line in journal:
+                if not line.endswith(b'\n'):
+                    torn = True
+                    break
+                try:
+                    entry = _json_loads(line)
+                except (json.JSONDecodeError, ValueError):
+                    continue
+                if entry.get('gen') != self._journal_generation:
+                    continue
+                self._journal_size += len(line)
+                
+                if entry.get('op') == 'add_protocol':
+                    self._order_cache.setdefault(entry['model'], {})[entry['name']] = None
+                    if 'versions' in entry:
+                        self._versions_cache.setdefault((entry['model'], entry['name']), entry['versions'])
+                elif entry.get('op') == 'add_version':
+                    data = self._versions_cache.get((entry['model'], entry['protocol']))
+                    if data is not None and entry['version'] not in data['versions']:
+                        data['versions'] = self._sort_versions([*data['versions'], entry['version']])
+        
+        if torn:
+            # A new generation leaves the torn line behind even if a crash
+            # keeps the rewrite from removing the journal
+            self._journal_generation += 1
+            self._journal_size = 0
+            self._save_index()
+    
+    def _migrate_to_index(self):
+        """
+        Build index.json from the older per-file layout (models.json, each
+        model's order.json and each protocol's versions.json), then remove
+        those files. A fresh data directory starts with the sample models.
+        """
+        models_file = self.base_path / "models.json"
+        legacy_files = [models_file]
         try:
-            with open(self.models_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return data.get('models', [])
+            models = self._load_json(models_file).get('models', [])
+        except FileNotFoundError:
+            models = ["chatgpt", "claude", "copilot"]
         except (json.JSONDecodeError, IOError):
-            return []
+            models = []
+        
+        self._models_cache = dict.fromkeys(models)
+        self._order_cache = {}
+        self._versions_cache = {}
+        for model_name in models:
+            self._ensure_model_directory(model_name)
+            order_file = self.base_path / model_name / "order.json"
+            legacy_files.append(order_file)
+            try:
+                protocols = self._load_json(order_file).get('protocols', [])
+            except (json.JSONDecodeError, IOError):
+                protocols = []
+            self._order_cache[model_name] = dict.fromkeys(protocols)
+            
+            for protocol_name in protocols:
+                versions_file = self._get_versions_file(model_name, protocol_name)
+                try:
+                    data = self._load_json(versions_file)
+                except FileNotFoundError:
+                    continue  # Not versioned yet; ensure_protocol_versions sets it up
+                except (json.JSONDecodeError, IOError):
+                    # Recover the version list from the version files themselves
+                    versions = [p.stem for p in versions_file.parent.glob("*.txt")]
+                    data = {'versions': versions, 'current': "1.0" if "1.0" in versions else max(
+                        versions, key=self._parse_version, default="1.0")}
+                legacy_files.append(versions_file)
+                data['versions'] = self._sort_versions(data.get('versions', []))
+                self._versions_cache[(model_name, protocol_name)] = data
+        
+        # The legacy files go only once index.json is safely on disk
+        try:
+            self._save_index(durable=True)
+        except OSError:
+            return  # Keep the legacy files; migration is retried on the next start
+        for path in legacy_files:
+            path.unlink(missing_ok=True)
+    
+    def _save_index(self, durable: bool = False):
+        """Write the cached models, protocol orders and version metadata to index.json."""
+        with self._cache_lock:
+            self._ensure_index()
+            index = {
+                'models': list(self._models_cache),
+                'protocols': {model: list(protocols) for model, protocols in self._order_cache.items()},
+                'versions': {f"{model}/{protocol}": data
+                             for (model, protocol), data in self._versions_cache.items()},
+            }
+            
+            # Leave journal lines written so far behind in the old generation
+            if self._journal_size:
+                self._journal_generation += 1
+                self._journal_size = 0
+            if self._journal_generation:
+                index['generation'] = self._journal_generation
+            self._ensure_directories()
+            self._index_size = len(self._dump_json(self.index_file, index, durable))
+    
+    def _journal_index_entry(self, entry: Dict[str, Any]):
+        """
+        Record an addition already made to the caches by appending it to
+        index.jsonl, the write-ahead log for index.json, instead of rewriting
+        index.json. Inside batch(), or once the log has outgrown
+        INDEX_JOURNAL_MAX_GROWTH times the index, index.json is rewritten
+        instead, which compacts the log away.
+        """
+        with self._cache_lock:
+            if self._batch_depth or self._journal_size > INDEX_JOURNAL_MAX_GROWTH * self._index_size:
+                self._save_index()
+                return
+            line = _json_dumps(dict(entry, gen=self._journal_generation)) + b'\n'
+            self._journal_size += len(line)
+            self._queue_append(self.index_file, line)
+    
+    def _model_index(self) -> Dict[str, None]:
+        """Return the cached model names as an ordered dict; do not modify it."""
+        with self._cache_lock:
+            self._ensure_index()
+            return self._models_cache
+    
+    def load_models(self) -> List[str]:
+        """Load list of models from the index, return in stored order."""
+        return list(self._model_index())
     
     def save_models(self, models: List[str]):
-        """Save list of models to models.json."""
-        self._ensure_directories()
-        with open(self.models_file, 'w', encoding='utf-8') as f:
-            json.dump({'models': models}, f, indent=2)
+        """Save list of models to the index."""
+        with self._cache_lock:
+            self._ensure_index()
+            self._models_cache = dict.fromkeys(models)
+            # Model list changes are the ones worth an fsync
+            self._save_index(durable=True)
     
     def add_model(self, model_name: str) -> bool:
         """Add a new model."""
-        models = self.load_models()
+        models = self._model_index()
         if model_name in models:
             return False
-        models.append(model_name)
-        self.save_models(models)
+        self.save_models([*models, model_name])
         self._ensure_model_directory(model_name)
         self.save_protocol_order(model_name, [])
         return True
     
     def rename_model(self, old_name: str, new_name: str) -> bool:
         """Rename a model and its directory."""
-        models = self.load_models()
+        models = self._model_index()
         if old_name not in models or new_name in models:
             return False
         
-        # Rename directory if it exists
-        old_path = self.base_path / old_name
-        new_path = self.base_path / new_name
-        if old_path.exists():
-            old_path.rename(new_path)
-        else:
+        # Rename directory if it exists; the rename itself is the existence check
+        try:
+            (self.base_path / old_name).rename(self.base_path / new_name)
+        except FileNotFoundError:
             self._ensure_model_directory(new_name)
         
+        # Cached protocol order and versions move with the directory
+        self._move_cached_model(old_name, new_name)
+        
         # Update models list
-        models[models.index(old_name)] = new_name
-        self.save_models(models)
+        self.save_models([new_name if m == old_name else m for m in models])
         return True
     
     def delete_model(self, model_name: str) -> bool:
         """Delete a model and its directory."""
-        models = self.load_models()
+        models = self._model_index()
         if model_name not in models:
             return False
         
-        # Remove from models list
-        models.remove(model_name)
-        self.save_models(models)
+        # Remove from models list along with its protocols and versions
+        self._move_cached_model(model_name)
+        self.save_models([m for m in models if m != model_name])
         
         # Delete directory if it exists
-        model_path = self.base_path / model_name
-        if model_path.exists():
-            shutil.rmtree(model_path)
+        self._discard_directory(self.base_path / model_name)
         
         return True
     
+    def _protocol_index(self, model_name: str) -> Dict[str, None]:
+        """Return a model's cached protocol names as an ordered dict; do not modify it."""
+        with self._cache_lock:
+            self._ensure_index()
+            return self._order_cache.get(model_name, {})
+    
     def load_protocol_order(self, model_name: str) -> List[str]:
         """Load protocol order for a specific model."""
-        order_file = self.base_path / model_name / "order.json"
-        
-        if not order_file.exists():
-            # Auto-create order.json
-            self._ensure_model_directory(model_name)
-            self.save_protocol_order(model_name, [])
-            return []
-        
-        try:
-            with open(order_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return data.get('protocols', [])
-        except (json.JSONDecodeError, IOError):
-            return []
+        return list(self._protocol_index(model_name))
     
     def save_protocol_order(self, model_name: str, protocols: List[str]):
         """Save protocol order for a specific model."""
-        model_path = self._ensure_model_directory(model_name)
-        order_file = model_path / "order.json"
-        
-        with open(order_file, 'w', encoding='utf-8') as f:
-            json.dump({'protocols': protocols}, f, indent=2)
+        with self._cache_lock:
+            self._ensure_index()
+            self._ensure_model_directory(model_name)
+            self._order_cache[model_name] = dict.fromkeys(protocols)
+            self._save_index()
+    
+    def load_all_protocol_orders(self) -> Dict[str, List[str]]:
+        """Load protocol order for every model, keyed by model name in model order."""
+        return {model: self.load_protocol_order(model) for model in self.load_models()}
+    
+    def save_hierarchy(self, models: List[str], protocol_orders: Dict[str, List[str]]):
+        """
+        Save model order and every model's protocol order in one pass.
+        The index is written once, and only if something changed.
+        """
+        with self.batch():
+            for model_name, protocols in protocol_orders.items():
+                if self.load_protocol_order(model_name) != protocols:
+                    self.save_protocol_order(model_name, protocols)
+            
+            if self.load_models() != models:
+                self.save_models(models)
     
     def load_protocol(self, model_name: str, protocol_name: str) -> str:
         """Load protocol content from text file."""
         protocol_file = self.base_path / model_name / f"{protocol_name}.txt"
         
-        if not protocol_file.exists():
+        try:
+            return self._read_text(protocol_file)
+        except FileNotFoundError:
             # Auto-create empty protocol file
             self._ensure_model_directory(model_name)
             self.save_protocol(model_name, protocol_name, "")
             return ""
-        
-        try:
-            with open(protocol_file, 'r', encoding='utf-8') as f:
-                return f.read()
         except IOError:
             return ""
     
@@ -149,198 +740,228 @@ class StorageManager:
         """Save protocol content to text file."""
         model_path = self._ensure_model_directory(model_name)
         protocol_file = model_path / f"{protocol_name}.txt"
-        
-        with open(protocol_file, 'w', encoding='utf-8') as f:
-            f.write(content)
+        self._write_text(protocol_file, content)
     
     def add_protocol(self, model_name: str, protocol_name: str) -> bool:
-        """Add a new protocol to a model."""
-        protocols = self.load_protocol_order(model_name)
-        if protocol_name in protocols:
-            return False
-        
-        protocols.append(protocol_name)
-        self.save_protocol_order(model_name, protocols)
-        self.save_protocol(model_name, protocol_name, "")
+        """
+        Add a new protocol to a model, already versioned with an empty 1.0.
+        The protocol and its version metadata are appended to the index
+        journal together rather than rewriting the index.
+        """
+        with self._cache_lock:
+            protocols = self._protocol_index(model_name)
+            if protocol_name in protocols:
+                return False
+            
+            # Create 1.0 in place, never clobbering a version file already there
+            self._ensure_model_directory(model_name)
+            self._get_protocol_dir(model_name, protocol_name).mkdir(exist_ok=True)
+            try:
+                open(self._get_version_file(model_name, protocol_name, "1.0"), 'xb').close()
+            except FileExistsError:
+                pass
+            
+            versions_data = {"versions": ["1.0"], "current": "1.0"}
+            self._order_cache[model_name] = {**protocols, protocol_name: None}
+            self._versions_cache[(model_name, protocol_name)] = versions_data
+            self._journal_index_entry({'op': 'add_protocol', 'model': model_name, 'name': protocol_name,
+                                       'versions': versions_data})
         return True
     
     def rename_protocol(self, model_name: str, old_name: str, new_name: str) -> bool:
-        """Rename a protocol and its file."""
-        protocols = self.load_protocol_order(model_name)
+        """Rename a protocol and its file/folder."""
+        protocols = self._protocol_index(model_name)
         if old_name not in protocols or new_name in protocols:
             return False
         
-        # Rename file if it exists
+        # Move the versioned protocol directory, keeping its versions; each
+        # rename doubles as the existence check
+        try:
+            self._get_protocol_dir(model_name, old_name).rename(self._get_protocol_dir(model_name, new_name))
+            has_versions = True
+        except FileNotFoundError:
+            has_versions = False
+        self._move_cached_protocol(model_name, old_name, new_name)
+        
+        # Rename legacy file if it exists
         old_file = self.base_path / model_name / f"{old_name}.txt"
         new_file = self.base_path / model_name / f"{new_name}.txt"
         
-        if old_file.exists():
+        try:
             old_file.rename(new_file)
-        else:
-            self.save_protocol(model_name, new_name, "")
+        except FileNotFoundError:
+            if not has_versions:
+                self.save_protocol(model_name, new_name, "")
         
         # Update protocol order
-        protocols[protocols.index(old_name)] = new_name
-        self.save_protocol_order(model_name, protocols)
+        self.save_protocol_order(model_name, [new_name if p == old_name else p for p in protocols])
         return True
     
     def delete_protocol(self, model_name: str, protocol_name: str) -> bool:
         """Delete a protocol and its file/folder."""
-        protocols = self.load_protocol_order(model_name)
+        protocols = self._protocol_index(model_name)
         if protocol_name not in protocols:
             return False
         
-        # Remove from order
-        protocols.remove(protocol_name)
-        self.save_protocol_order(model_name, protocols)
+        # Remove from order along with its version metadata
+        self._move_cached_protocol(model_name, protocol_name)
+        self.save_protocol_order(model_name, [p for p in protocols if p != protocol_name])
         
         # Delete versioned protocol directory if it exists
-        protocol_dir = self._get_protocol_dir(model_name, protocol_name)
-        if protocol_dir.exists():
-            shutil.rmtree(protocol_dir)
+        self._discard_directory(self._get_protocol_dir(model_name, protocol_name))
         
         # Delete legacy .txt file if it exists
-        protocol_file = self.base_path / model_name / f"{protocol_name}.txt"
-        if protocol_file.exists():
-            protocol_file.unlink()
+        (self.base_path / model_name / f"{protocol_name}.txt").unlink(missing_ok=True)
         
         return True
     
     # ============= Version Management Methods =============
     
-    def _parse_version(self, version: str) -> tuple:
-        """
-        Parse version string to tuple for comparison.
-        Returns (major, minor) or (0, 0) for invalid versions.
-        """
-        try:
-            parts = version.split('.')
-            return (int(parts[0]), int(parts[1]) if len(parts) > 1 else 0)
-        except (ValueError, IndexError):
-            return (0, 0)
+    _parse_version = staticmethod(_parse_version_tuple)
+    
+    def _sort_versions(self, versions: List[str]) -> List[str]:
+        """Return versions ordered semantically."""
+        return sorted(versions, key=self._parse_version)
     
     def _get_protocol_dir(self, model_name: str, protocol_name: str) -> Path:
         """Get the directory path for a protocol."""
-        return self.base_path / model_name / protocol_name
+        return _data_path(self.base_path, model_name, protocol_name)
     
     def _get_versions_file(self, model_name: str, protocol_name: str) -> Path:
-        """Get the versions.json file path for a protocol."""
-        return self._get_protocol_dir(model_name, protocol_name) / "versions.json"
+        """Get the pre-index versions.json file path for a protocol, used when migrating."""
+        return _data_path(self.base_path, model_name, protocol_name, "versions.json")
     
     def _get_version_file(self, model_name: str, protocol_name: str, version: str) -> Path:
         """Get the file path for a specific version."""
-        return self._get_protocol_dir(model_name, protocol_name) / f"{version}.txt"
+        return _data_path(self.base_path, model_name, protocol_name, f"{version}.txt")
+    
+    def _get_delta_file(self, model_name: str, protocol_name: str, version: str) -> Path:
+        """Get the pending edit delta log path for a specific version."""
+        return _data_path(self.base_path, model_name, protocol_name, f"{version}.delta")
+    
+    def _version_lock(self, version_file: Path) -> threading.RLock:
+        """Get the lock held while a version file or its delta log changes."""
+        with self._cache_lock:
+            return self._version_locks.setdefault(version_file, threading.RLock())
+    
+    def _load_versions_data(self, model_name: str, protocol_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Return a copy of a protocol's version metadata from the index, or None
+        if it has none. The version list is kept sorted.
+        """
+        with self._cache_lock:
+            self._ensure_index()
+            data = self._versions_cache.get((model_name, protocol_name))
+            if data is None:
+                return None
+            return dict(data, versions=list(data.get('versions', [])))
+    
+    def _save_versions_data(self, model_name: str, protocol_name: str, data: Dict[str, Any],
+                            durable: bool = False):
+        """Store a protocol's version metadata, versions sorted, and write the index."""
+        data = dict(data, versions=self._sort_versions(data.get('versions', [])))
+        with self._cache_lock:
+            self._ensure_index()
+            self._versions_cache[(model_name, protocol_name)] = data
+            self._save_index(durable)
     
     def ensure_protocol_versions(self, model_name: str, protocol_name: str):
         """
         Ensure protocol has version structure. Migrates old .txt format if needed.
-        Creates versions.json with 1.0 as default if missing.
+        Creates version metadata with 1.0 as default if missing.
         """
-        protocol_dir = self._get_protocol_dir(model_name, protocol_name)
-        versions_file = self._get_versions_file(model_name, protocol_name)
-        old_protocol_file = self.base_path / model_name / f"{protocol_name}.txt"
-        
-        # Check if we need to migrate from old format
-        if not versions_file.exists() and old_protocol_file.exists():
-            # Migration: old flat .txt file exists
-            protocol_dir.mkdir(parents=True, exist_ok=True)
+        with self._cache_lock:
+            # Version metadata in the index means the structure is already there
+            self._ensure_index()
+            if (model_name, protocol_name) in self._versions_cache:
+                return
             
-            # Read old content
-            content = old_protocol_file.read_text(encoding='utf-8')
+            protocol_dir = self._get_protocol_dir(model_name, protocol_name)
+            old_protocol_file = self.base_path / model_name / f"{protocol_name}.txt"
             
-            # Create version 1.0 with the old content
-            version_file = self._get_version_file(model_name, protocol_name, "1.0")
-            version_file.write_text(content, encoding='utf-8')
-            
-            # Create versions.json
-            versions_data = {
-                "versions": ["1.0"],
-                "current": "1.0"
-            }
-            with open(versions_file, 'w', encoding='utf-8') as f:
-                json.dump(versions_data, f, indent=2)
-            
-            # Delete old file
-            old_protocol_file.unlink()
-            
-        elif not versions_file.exists():
-            # No old file, create fresh versioning structure
-            protocol_dir.mkdir(parents=True, exist_ok=True)
+            # The model directory is usually known to exist already
+            self._ensure_model_directory(model_name)
+            protocol_dir.mkdir(exist_ok=True)
             
-            # Create empty version 1.0
+            # An old flat .txt file is moved into place as version 1.0 without
+            # copying its content; otherwise 1.0 starts empty, never clobbering
+            # a version file left without metadata
             version_file = self._get_version_file(model_name, protocol_name, "1.0")
-            version_file.write_text("", encoding='utf-8')
+            try:
+                old_protocol_file.rename(version_file)
+            except FileNotFoundError:
+                try:
+                    open(version_file, 'xb').close()
+                except FileExistsError:
+                    pass
             
-            # Create versions.json
+            # Record version metadata
             versions_data = {
                 "versions": ["1.0"],
                 "current": "1.0"
             }
-            with open(versions_file, 'w', encoding='utf-8') as f:
-                json.dump(versions_data, f, indent=2)
+            self._save_versions_data(model_name, protocol_name, versions_data)
     
     def list_versions(self, model_name: str, protocol_name: str) -> List[str]:
         """
         List all versions for a protocol, ordered semantically.
         Returns empty list if no versions exist.
         """
-        versions_file = self._get_versions_file(model_name, protocol_name)
-        
-        if not versions_file.exists():
+        data = self._load_versions_data(model_name, protocol_name)
+        if data is None:
             return []
         
-        try:
-            with open(versions_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                versions = data.get('versions', [])
-                
-                # Sort versions by semantic versioning
-                return sorted(versions, key=self._parse_version)
-        except (json.JSONDecodeError, IOError):
-            return []
+        # Stored and cached in semantic order already
+        return data['versions']
     
     def get_current_version(self, model_name: str, protocol_name: str) -> str:
         """
         Get the current/default version for a protocol.
         Returns "1.0" if not set or file doesn't exist.
         """
-        versions_file = self._get_versions_file(model_name, protocol_name)
-        
-        if not versions_file.exists():
-            return "1.0"
-        
-        try:
-            with open(versions_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return data.get('current', "1.0")
-        except (json.JSONDecodeError, IOError):
+        data = self._load_versions_data(model_name, protocol_name)
+        if data is None:
             return "1.0"
+        return data.get('current', "1.0")
+    
+    def get_versions_info(self, model_name: str, protocol_name: str) -> Tuple[List[str], str]:
+        """
+        Return (list_versions(...), get_current_version(...)) from a single
+        lookup of the protocol's version metadata.
+        """
+        data = self._load_versions_data(model_name, protocol_name)
+        if data is None:
+            return [], "1.0"
+        return data['versions'], data.get('current', "1.0")
     
     def set_current_version(self, model_name: str, protocol_name: str, version: str) -> bool:
         """
         Set the current/default version for a protocol.
         Returns True if successful, False otherwise.
         """
-        versions_file = self._get_versions_file(model_name, protocol_name)
+        data = self._load_versions_data(model_name, protocol_name)
+        if data is None:
+            return False
         
-        if not versions_file.exists():
+        # Verify version exists
+        if version not in data['versions']:
             return False
         
+        # Already current: nothing to write
+        if data.get('current') == version:
+            return True
+        
+        previous = data.get('current')
+        data['current'] = version
+        
+        # Written durably, so a failure is reported here rather than lost on the writer thread
         try:
-            with open(versions_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # Verify version exists
-            if version not in data.get('versions', []):
-                return False
-            
-            data['current'] = version
-            
-            with open(versions_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2)
-            
+            self._save_versions_data(model_name, protocol_name, data, durable=True)
             return True
-        except (json.JSONDecodeError, IOError):
+        except IOError:
+            # Keep the cached current version matching the disk
+            with self._cache_lock:
+                self._versions_cache[(model_name, protocol_name)]['current'] = previous
             return False
     
     def create_new_version(self, model_name: str, protocol_name: str, base_version: str = None) -> Optional[str]:
@@ -349,17 +970,13 @@ class StorageManager:
         Copies content from base_version if provided, otherwise empty.
         Returns the new version name (e.g., "1.1") or None if failed.
         """
-        versions_file = self._get_versions_file(model_name, protocol_name)
-        
-        if not versions_file.exists():
+        data = self._load_versions_data(model_name, protocol_name)
+        if data is None:
             return None
         
         try:
-            with open(versions_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # Use list_versions to get sorted list
-            versions = self.list_versions(model_name, protocol_name)
+            # Already in semantic order
+            versions = data['versions']
             
             if not versions:
                 return None
@@ -370,29 +987,34 @@ class StorageManager:
             
             new_version = f"{major}.{minor + 1}"
             
+            # Never overwrite a version file whose metadata was lost, such as
+            # one recorded only in a torn journal line
+            while self._get_version_file(model_name, protocol_name, new_version).exists():
+                minor += 1
+                new_version = f"{major}.{minor + 1}"
+            
             # Get content from base version or use empty
             content = ""
             if base_version and base_version in versions:
-                base_file = self._get_version_file(model_name, protocol_name, base_version)
-                if base_file.exists():
-                    content = base_file.read_text(encoding='utf-8')
+                content = self.read_version(model_name, protocol_name, base_version)
             elif base_version is None and versions:
                 # Use current version as base if no base specified
                 current = data.get('current', versions[-1])
-                current_file = self._get_version_file(model_name, protocol_name, current)
-                if current_file.exists():
-                    content = current_file.read_text(encoding='utf-8')
+                content = self.read_version(model_name, protocol_name, current)
             
             # Create new version file
             new_file = self._get_version_file(model_name, protocol_name, new_version)
-            new_file.write_text(content, encoding='utf-8')
+            self._write_text(new_file, content)
             
-            # Update versions.json
+            # Update version metadata; the new version sorts last, so it is
+            # appended to the index journal rather than rewriting the index
             versions.append(new_version)
             data['versions'] = versions
             
-            with open(versions_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2)
+            with self._cache_lock:
+                self._versions_cache[(model_name, protocol_name)] = data
+                self._journal_index_entry({'op': 'add_version', 'model': model_name,
+                                           'protocol': protocol_name, 'version': new_version})
             
             return new_version
         except (json.JSONDecodeError, IOError, ValueError):
@@ -412,24 +1034,109 @@ class StorageManager:
         
         version_file = self._get_version_file(model_name, protocol_name, version)
         
-        if not version_file.exists():
-            return ""
+        with self._version_lock(version_file):
+            try:
+                content = self._read_text(version_file)
+            except IOError:
+                return ""  # Missing or unreadable
+            
+            # Fold any pending edit deltas into the version file
+            delta_file = self._get_delta_file(model_name, protocol_name, version)
+            if delta_file in self._delta_free:
+                return content
+            try:
+                content = self._apply_deltas(content, delta_file)
+                self.write_version(model_name, protocol_name, version, content, durable=False)
+            except FileNotFoundError:
+                self._delta_free.add(delta_file)  # No pending deltas
+            except (json.JSONDecodeError, IOError, ValueError):
+                pass
+            
+            return content
+    
+    def load_all_protocols(self, model_name: str) -> Dict[str, str]:
+        """
+        Read the current version of every protocol in a model, keyed by name
+        in protocol order. Files are read in parallel rather than one by one.
+        """
+        protocols = self.load_protocol_order(model_name)
+        if not protocols:
+            return {}
         
-        try:
-            return version_file.read_text(encoding='utf-8')
-        except IOError:
-            return ""
+        def read(protocol_name):
+            return self.read_version(model_name, protocol_name)
+        
+        with ThreadPoolExecutor(max_workers=min(BULK_READ_WORKERS, len(protocols))) as pool:
+            return dict(zip(protocols, pool.map(read, protocols)))
     
-    def write_version(self, model_name: str, protocol_name: str, version: str, content: str):
+    def write_version(self, model_name: str, protocol_name: str, version: str, content: str,
+                      durable: bool = True):
         """
         Write content to a specific version file.
+        Replaces any pending edit deltas for that version. Saves of user
+        content are fsynced unless durable is False.
         """
         # Ensure versioning is set up
         self.ensure_protocol_versions(model_name, protocol_name)
         
         version_file = self._get_version_file(model_name, protocol_name, version)
-        version_file.write_text(content, encoding='utf-8')
+        with self._version_lock(version_file):
+            self._write_text(version_file, content, durable)
+            
+            delta_file = self._get_delta_file(model_name, protocol_name, version)
+            delta_file.unlink(missing_ok=True)
+            self._delta_free.add(delta_file)
+    
+    def append_delta(self, model_name: str, protocol_name: str, version: str, deltas: List[tuple]):
+        """
+        Append edit deltas for a version instead of rewriting the whole file.
+        Each delta is (position, chars_removed, added_text), applied in order
+        on top of the version file; they are compacted on the next read_version.
+        """
+        # Ensure versioning is set up
+        self.ensure_protocol_versions(model_name, protocol_name)
+        
+        delta_file = self._get_delta_file(model_name, protocol_name, version)
+        lines = b''.join(_json_dumps([position, removed, added]) + b'\n'
+                         for position, removed, added in deltas)
+        with self._version_lock(self._get_version_file(model_name, protocol_name, version)):
+            # A log not written this session may end in a line torn by a crash;
+            # compacting it first keeps the new lines from being glued onto it
+            if delta_file not in self._delta_free and delta_file not in self._delta_clean:
+                self.read_version(model_name, protocol_name, version)
+            self._delta_free.discard(delta_file)
+            _append_bytes(delta_file, lines)
+            self._delta_clean.add(delta_file)
+    
+    def _apply_deltas(self, content: str, delta_file: Path) -> str:
+        """
+        Replay a delta log on top of content and return the result. Lines are
+        parsed straight from the bytes; an unterminated last line, left by a
+        crash mid-append, is dropped, as is any line that does not parse.
+        """
+        data = delta_file.read_bytes()
+        for line in data[:data.rfind(b'\n') + 1].split(b'\n'):
+            if not line:
+                continue
+            try:
+                position, removed, added = _json_loads(line)
+            except (ValueError, TypeError):
+                continue
+            content = content[:position] + added + content[position + removed:]
+        return content
+
+
+# Global storage manager instance, created on first access
+_storage: Optional[StorageManager] = None
+_storage_lock = threading.Lock()
 
 
-# Global storage manager instance
-storage = StorageManager()
+def __getattr__(name: str):
+    """Create the global storage manager the first time it is imported."""
+    global _storage
+    if name == 'storage':
+        with _storage_lock:
+            if _storage is None:
+                _storage = StorageManager()
+        return _storage
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")